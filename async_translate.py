@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+import config
+from layout import create_assembler
+from phrase_table import create_phrase_table
+from translation_cache import TranslationCache
+
+class CircuitBreaker:
+    """Fail fast after repeated backend failures
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests are rejected without touching the network. Once
+    `reset_timeout` seconds have passed a single trial request is let
+    through (half-open); its success closes the circuit, its failure opens
+    it again for another timeout.
+    """
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = (config.TRANSLATION_BREAKER_FAILURES
+                                  if failure_threshold is None else failure_threshold)
+        self.reset_timeout = (config.TRANSLATION_BREAKER_RESET
+                              if reset_timeout is None else reset_timeout)
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self.stats = {'opened': 0, 'rejected': 0}
+
+    def allow(self):
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and time.time() - self._opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+            return True
+        self.stats['rejected'] += 1
+        return False
+
+    def record_success(self):
+        self.state = 'closed'
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == 'half_open' or self._failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.stats['opened'] += 1
+            self.state = 'open'
+            self._opened_at = time.time()
+
+class HTTPTranslationClient:
+    """LibreTranslate-style JSON client over a pooled keep-alive aiohttp session"""
+    def __init__(self, url=None, max_connections=None):
+        self.url = config.TRANSLATION_HTTP_URL if url is None else url
+        self.max_connections = (config.TRANSLATION_HTTP_CONCURRENCY
+                                if max_connections is None else max_connections)
+        self._session = None
+
+    async def start(self):
+        import aiohttp  # Deferred: only needed for the http backend
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(connector=connector)
+
+    async def translate(self, text, dest):
+        payload = {'q': text, 'source': 'auto', 'target': dest, 'format': 'text'}
+        async with self._session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data['translatedText']
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class AsyncTranslationProcessor:
+    """Translate OCR results on an asyncio loop with bounded, deadline-limited requests
+
+    Each uncached string is its own request, at most `concurrency` at a
+    time, and each must finish (including the wait for a free slot) within
+    `timeout` seconds. submit() returns immediately and calls on_result
+    with the full result list every time another translation lands, so
+    the display fills in as answers arrive. Requests for a string already
+    in flight are shared, and results of superseded submissions are not
+    delivered. process() and process_batch() keep the synchronous
+    TranslationProcessor interface for batch and server mode.
+    """
+    def __init__(self, target_lang='hi', client=None, cache=None, concurrency=None,
+                 timeout=None, breaker=None, phrases=None):
+        self.target_lang = target_lang
+        self.client = HTTPTranslationClient() if client is None else client
+        self.cache = cache if cache is not None else TranslationCache()
+        self.layout = create_assembler()
+        self.phrases = phrases if phrases is not None else create_phrase_table()
+        self.concurrency = (config.TRANSLATION_HTTP_CONCURRENCY
+                            if concurrency is None else concurrency)
+        self.timeout = config.TRANSLATION_HTTP_TIMEOUT if timeout is None else timeout
+        self.breaker = CircuitBreaker() if breaker is None else breaker
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'timeouts': 0,
+                      'circuit_rejected': 0, 'shared': 0, 'deliveries': 0, 'superseded': 0}
+        self._generation = 0
+        self._inflight = {}
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self._call(self._start())
+
+    def _call(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _start(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        await self.client.start()
+
+    async def _request(self, text):
+        async with self._semaphore:
+            return await self.client.translate(text, self.target_lang)
+
+    async def _fetch(self, text):
+        """Translation of text, or text itself if the backend failed or is unavailable"""
+        if not self.breaker.allow():
+            self.stats['circuit_rejected'] += 1
+            return text, text
+        self.stats['requests'] += 1
+        try:
+            translated = await asyncio.wait_for(self._request(text), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+        except Exception:
+            self.stats['failed'] += 1
+        else:
+            self.stats['succeeded'] += 1
+            self.breaker.record_success()
+            self.cache.put(text, self.target_lang, translated)
+            return text, translated
+        self.breaker.record_failure()
+        self.cache.put_failure(text, self.target_lang)
+        return text, text
+
+    def _task(self, text):
+        task = self._inflight.get(text)
+        if task is not None:
+            self.stats['shared'] += 1
+            return task
+        task = self._loop.create_task(self._fetch(text))
+        self._inflight[text] = task
+        task.add_done_callback(lambda _: self._inflight.pop(text, None))
+        return task
+
+    def _apply(self, units, translations):
+        return [{'original': unit['text'],
+                 'translated': translations.get(unit['text'], unit['text']),
+                 'bbox': unit['bbox'],
+                 'confidence': unit['confidence']} for unit in units]
+
+    async def _process(self, units, on_result=None, generation=None):
+        translations = {}
+        tasks = []
+        for text in dict.fromkeys(unit['text'] for unit in units):
+            fixed = self.phrases.lookup(text, self.target_lang)
+            cached = fixed if fixed is not None else self.cache.get(text, self.target_lang)
+            if cached is not None:
+                translations[text] = cached
+            elif self.cache.is_failed(text, self.target_lang):
+                translations[text] = text
+            else:
+                tasks.append(self._task(text))
+
+        def deliver():
+            if generation != self._generation:
+                self.stats['superseded'] += 1
+                return
+            self.stats['deliveries'] += 1
+            on_result(self._apply(units, translations))
+
+        # Cached text goes to the display first; each remote answer follows as it lands
+        if on_result is not None and (translations or not tasks):
+            deliver()
+        for next_done in asyncio.as_completed(tasks):
+            text, translated = await next_done
+            translations[text] = translated
+            if on_result is not None:
+                deliver()
+        return self._apply(units, translations)
+
+    def submit(self, ocr_results, on_result):
+        """Translate in the background, calling on_result(results) as translations arrive"""
+        units = self.layout.assemble(ocr_results)
+        self._generation += 1
+        return asyncio.run_coroutine_threadsafe(
+            self._process(units, on_result, self._generation), self._loop)
+
+    def process(self, ocr_results):
+        if not ocr_results:
+            return []
+        return self._call(self._process(self.layout.assemble(ocr_results)))
+
+    def process_batch(self, batch):
+        async def run():
+            return await asyncio.gather(*(self._process(self.layout.assemble(ocr_results))
+                                          for ocr_results in batch))
+        return self._call(run()) if batch else []
+
+    def close(self):
+        self._call(self.client.close(), timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
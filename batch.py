@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Run OCR and translation over a video file or image folder without a display
+
+Frames are OCR'd by a pool of worker processes, translated in batches in the
+main process and written in frame order as JSON lines. Re-running with the
+same output file resumes after the last frame already written.
+
+Usage:
+    python3 batch.py footage.mp4 results.jsonl --workers 4 --video-out annotated.mp4
+    python3 batch.py signs/ results.jsonl --lang hi
+"""
+import argparse
+import collections
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import config
+from capture import open_source, ImageFolderCapture
+
+_ocr = None
+
+def _init_worker(threads):
+    global _ocr
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from ocr import OCRProcessor
+    _ocr = OCRProcessor()
+
+def _ocr_frame(frame):
+    return _ocr.process(frame)
+
+def resume_point(path):
+    """Index of the next frame to process, dropping a partially written last line"""
+    if not os.path.exists(path):
+        return 0
+    next_frame = 0
+    good_bytes = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            next_frame = record['frame'] + 1
+            good_bytes += len(line)
+    with open(path, 'r+b') as f:
+        f.truncate(good_bytes)
+    return next_frame
+
+def read_frames(source, start=0, stride=1):
+    """Yield (index, name, timestamp, frame) from a video file or image folder"""
+    cap = open_source(source)
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open {source}")
+    index = 0
+    try:
+        while True:
+            # Skipped frames are only grabbed, not decoded
+            if index < start or index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if isinstance(cap, ImageFolderCapture):
+                name, timestamp = os.path.basename(cap.files[cap.index]), None
+            else:
+                name, timestamp = None, round(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, 3)
+            yield index, name, timestamp, frame
+            index += 1
+    finally:
+        cap.release()
+
+def source_fps(source):
+    """Frame rate recorded in a video file; CAMERA_FPS for image folders or when unknown"""
+    cap = open_source(source)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return fps if fps and fps > 0 else config.CAMERA_FPS
+
+class BatchRunner:
+    """Stream frames through OCR workers and translation, writing JSONL in order"""
+    def __init__(self, source, output, target_lang='hi', workers=None, stride=1,
+                 video_out=None, translate_batch=8, report_every=10.0):
+        self.source = source
+        self.output = output
+        self.target_lang = target_lang
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.stride = max(1, stride)
+        self.video_out = video_out
+        self.translate_batch = max(1, translate_batch)
+        self.report_every = report_every
+        self.stats = {'frames': 0, 'results': 0, 'resumed_from': 0}
+
+    def _translate(self, pending, translator, out, writer, display):
+        batch = translator.process_batch([results for (_, _, _, _, results) in pending])
+        for (index, name, timestamp, frame, _), translated in zip(pending, batch):
+            record = {'frame': index, 'results': translated}
+            if name is not None:
+                record['file'] = name
+            if timestamp is not None:
+                record['time'] = timestamp
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if writer is not None:
+                writer.write(display.overlay(frame, translated))
+            self.stats['frames'] += 1
+            self.stats['results'] += len(translated)
+        out.flush()
+        pending.clear()
+
+    def _open_writer(self, frame):
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        height, width = frame.shape[:2]
+        return cv2.VideoWriter(self.video_out, fourcc, source_fps(self.source) / self.stride,
+                               (width, height))
+
+    def run(self):
+        from translate import TranslationProcessor
+        from display import DisplayProcessor
+
+        start_frame = resume_point(self.output)
+        self.stats['resumed_from'] = start_frame
+        if start_frame and self.video_out:
+            print(f"Resuming at frame {start_frame}; {self.video_out} will contain new frames only",
+                  file=sys.stderr)
+
+        translator = TranslationProcessor(self.target_lang)
+        display = DisplayProcessor() if self.video_out else None
+        writer = None
+        frames = read_frames(self.source, start_frame, self.stride)
+
+        executor = None
+        if self.workers > 0:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            executor = ProcessPoolExecutor(self.workers, mp_context=mp.get_context('spawn'),
+                                           initializer=_init_worker, initargs=(threads,))
+        else:
+            _init_worker(os.cpu_count() or 1)
+
+        # Bounded window of in-flight frames keeps memory flat on long videos
+        window = collections.deque()
+        max_in_flight = max(2 * self.workers, 1)
+        pending = []
+        started = last_report = time.time()
+        try:
+            with open(self.output, 'a', encoding='utf-8') as out:
+                exhausted = False
+                while window or not exhausted:
+                    while not exhausted and len(window) < max_in_flight:
+                        item = next(frames, None)
+                        if item is None:
+                            exhausted = True
+                            break
+                        job = (executor.submit(_ocr_frame, item[3]) if executor
+                               else _ocr_frame(item[3]))
+                        window.append((item, job))
+                    if not window:
+                        break
+
+                    (index, name, timestamp, frame), job = window.popleft()
+                    results = job.result() if executor else job
+                    if writer is None and self.video_out:
+                        writer = self._open_writer(frame)
+                    pending.append((index, name, timestamp, frame, results))
+                    if len(pending) >= self.translate_batch:
+                        self._translate(pending, translator, out, writer, display)
+
+                    if time.time() - last_report >= self.report_every:
+                        last_report = time.time()
+                        rate = self.stats['frames'] / (last_report - started)
+                        print(f"frame {index}: {rate:.2f} frames/s", file=sys.stderr)
+                if pending:
+                    self._translate(pending, translator, out, writer, display)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if writer is not None:
+                writer.release()
+            translator.cache.close()
+
+        elapsed = time.time() - started
+        self.stats['seconds'] = round(elapsed, 2)
+        self.stats['frames_per_second'] = round(self.stats['frames'] / elapsed, 2) if elapsed else 0.0
+        return self.stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='video file or directory of images')
+    parser.add_argument('output', help='JSONL results file (appended to when resuming)')
+    parser.add_argument('--lang', default='hi', help='target language')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='OCR worker processes (0 runs in-process)')
+    parser.add_argument('--stride', type=int, default=1, help='process every Nth frame')
+    parser.add_argument('--video-out', help='write annotated video to this file')
+    parser.add_argument('--translate-batch', type=int, default=8,
+                        help='frames per translation backend call')
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.source, args.output, target_lang=args.lang, workers=args.workers,
+                         stride=args.stride, video_out=args.video_out,
+                         translate_batch=args.translate_batch)
+    print(json.dumps(runner.run()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare BGR and luma (YUYV) capture: time and bytes touched per frame
+
+Converts a video into a raw YUYV file (what a USB camera delivers), then
+replays it through CaptureThread in 'bgr' mode, where the YUYV frames are
+converted to BGR on capture as OpenCV does by default, and in 'yuyv' mode,
+where stages get the luma plane and only displayed frames become BGR. Each
+frame gets the colour work the pipeline does on it: grayscale for frame
+selection and tracking, RGB and grayscale for OCR on submitted frames, and
+BGR for display on every --display-every-th frame.
+
+Usage:
+    python3 bench_capture.py footage.mp4 --frames 300 --ocr-every 4 --display-every 1
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+import config
+from capture import CaptureThread
+
+def bgr_to_yuyv(frame):
+    """Pack a BGR frame as YUYV 4:2:2 (chroma averaged over pixel pairs)"""
+    yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV)
+    height, width = yuv.shape[:2]
+    packed = np.empty((height, width * 2), dtype=np.uint8)
+    packed[:, 0::2] = yuv[:, :, 0]
+    chroma = yuv[:, :, 1:].reshape(height, width // 2, 2, 2).mean(axis=2).astype(np.uint8)
+    packed[:, 1::4] = chroma[:, :, 0]
+    packed[:, 3::4] = chroma[:, :, 1]
+    return packed
+
+def write_yuyv(video, path, frames, width, height):
+    cap = cv2.VideoCapture(video)
+    written = 0
+    with open(path, 'wb') as f:
+        while written < frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            f.write(bgr_to_yuyv(frame).tobytes())
+            written += 1
+    cap.release()
+    return written
+
+class Touch:
+    """Accumulates bytes read plus written and time spent by per-frame conversions"""
+    def __init__(self):
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __call__(self, func, src, *args):
+        start = time.perf_counter()
+        dst = func(src, *args)
+        self.seconds += time.perf_counter() - start
+        self.bytes += src.nbytes + dst.nbytes
+        return dst
+
+def run(path, pixel_format, frames, ocr_every, display_every):
+    capture = CaptureThread(path, config.CAMERA_WIDTH, config.CAMERA_HEIGHT, fps=1000,
+                            pixel_format=pixel_format)
+    touch = Touch()
+    width, height = capture.width, capture.height
+    small = config.FRAME_SELECT_SIZE
+    capture.start()
+    start = time.perf_counter()
+    consumed = last_seq = 0
+    while consumed < frames:
+        frame = capture.read_next(last_seq, timeout=1.0)
+        if frame is None:
+            break
+        last_seq = frame.seq
+        consumed += 1
+
+        def gray(img):
+            return img if img.ndim == 2 else touch(cv2.cvtColor, img, cv2.COLOR_BGR2GRAY)
+        touch(cv2.resize, gray(frame), small, None, 0, 0, cv2.INTER_AREA)  # Frame selection
+        gray(frame)  # Tracking
+        if consumed % ocr_every == 0:
+            if frame.ndim == 3:
+                touch(cv2.cvtColor, frame, cv2.COLOR_BGR2RGB)  # Detector input
+            gray(frame)  # Recognizer input
+        if consumed % display_every == 0:
+            capture.to_bgr(frame)
+        del frame
+    elapsed = time.perf_counter() - start
+    capture.stop()
+
+    stats = capture.stats
+    captured = max(stats['captured'], 1)
+    # In BGR mode OpenCV converts every YUYV frame on capture (raw read + BGR write)
+    capture_bytes = stats['bytes_captured'] + (captured * width * height * 2
+                                               if pixel_format == 'bgr' else 0)
+    # The consumer may skip frames the capture thread produced, and by different
+    # amounts per mode: wall time and capture work are per captured frame, stage
+    # work per consumed frame
+    consumed = max(consumed, 1)
+    touched = capture_bytes / captured + (touch.bytes + stats['bgr_bytes']) / consumed
+    return {'format': pixel_format, 'frames_captured': stats['captured'], 'frames': consumed,
+            'ms_per_frame': round(elapsed / captured * 1000, 3),
+            'conversion_ms_per_frame': round((touch.seconds + stats['bgr_seconds'])
+                                             / consumed * 1000, 3),
+            'mb_touched_per_frame': round(touched / 1e6, 3),
+            'bgr_conversions': stats['bgr_conversions']}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('video', help='video file, or an existing .yuv file')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--ocr-every', type=int, default=4, help='frames per OCR submission')
+    parser.add_argument('--display-every', type=int, default=1, help='frames per displayed frame')
+    args = parser.parse_args()
+
+    path = args.video
+    if not path.lower().endswith('.yuv'):
+        handle, path = tempfile.mkstemp(suffix='.yuv')
+        os.close(handle)
+        write_yuyv(args.video, path, args.frames, config.CAMERA_WIDTH, config.CAMERA_HEIGHT)
+    try:
+        for pixel_format in ('bgr', 'yuyv'):
+            print(json.dumps(run(path, pixel_format, args.frames, args.ocr_every,
+                                 args.display_every)))
+    finally:
+        if path != args.video:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
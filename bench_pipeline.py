@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded video or image folder through the full AR Glasses pipeline
+
+Runs CaptureThread -> OCRProcessor -> TranslationProcessor -> DisplayProcessor
+headless and reports throughput, per-stage and glass-to-glass latency
+percentiles, channel drops and peak RSS as JSON. With --baseline the run is
+compared against a stored report and the exit code is 1 on regression.
+
+Usage:
+    python3 bench_pipeline.py recording.mp4 --fake-ocr --output report.json
+    python3 bench_pipeline.py frames/ --baseline bench_baseline.json
+"""
+import argparse
+import json
+import resource
+import sys
+import threading
+import time
+import cv2
+import config
+
+class TimedStage:
+    """Proxy that records wall time of a stage's processing methods"""
+    def __init__(self, inner, methods, samples):
+        self._inner = inner
+        self._samples = samples
+        for name in methods:
+            setattr(self, name, self._wrap(getattr(inner, name)))
+
+    def _wrap(self, method):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._samples.append(time.perf_counter() - start)
+        return timed
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+class FakeOCRProcessor:
+    """Deterministic OCR stand-in with fixed latency
+
+    Boxes are centred on the strongest corners of the frame, so they cover
+    real texture and the overlay tracker follows them like OCR'd text.
+    """
+    TEXTS = [('EXIT', 80, 95), ('NO PARKING', 160, 88)]
+
+    def __init__(self, latency=0.15):
+        self.latency = latency
+
+    def process(self, frame, scale=1.0):
+        time.sleep(self.latency)
+        height, width = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        corners = cv2.goodFeaturesToTrack(gray, maxCorners=len(self.TEXTS), qualityLevel=0.01,
+                                          minDistance=min(width, height) // 4)
+        centres = ([tuple(int(v) for v in c.ravel()) for c in corners] if corners is not None
+                   else [])
+        centres += [(width // 4 * (i + 1), height // 4 * (i + 1))
+                    for i in range(len(centres), len(self.TEXTS))]  # Flat frame fallback
+        results = []
+        for (text, w, confidence), (cx, cy) in zip(self.TEXTS, centres):
+            x = min(max(cx - w // 2, 0), width - w)
+            y = min(max(cy - 15, 0), height - 30)
+            results.append({'text': text, 'bbox': (x, y, w, 30), 'confidence': confidence})
+        return results
+
+    def cache_stats(self):
+        return {}
+
+def percentiles(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {'count': len(ordered), 'mean': round(sum(ordered) / len(ordered) * 1000, 3),
+            'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+def run_benchmark(source, fake_ocr=False, ocr_latency=0.15, translate_latency=0.05,
+                  max_frames=None, drain_time=1.0):
+    from main import ARGlassesApp
+    from translate import TranslationProcessor, StubTranslationBackend
+    from translation_cache import TranslationCache
+
+    samples = {'ocr': [], 'translation': [], 'display': []}
+    glass_to_glass = []
+    capture_to_display = []
+
+    ocr = FakeOCRProcessor(ocr_latency) if fake_ocr else None
+    if ocr is None:
+        from ocr import OCRProcessor
+        ocr = OCRProcessor()
+    translator = TranslationProcessor('hi', backend=StubTranslationBackend(translate_latency),
+                                      cache=TranslationCache(db_path=''))
+
+    class BenchmarkApp(ARGlassesApp):
+        def __init__(self):
+            super().__init__(camera_src=source,
+                             ocr_processor=TimedStage(ocr, ['process'], samples['ocr']),
+                             translation_processor=TimedStage(
+                                 translator, ['process', 'process_batch'], samples['translation']))
+            self.compositor = TimedStage(self.compositor, ['compose'], samples['display'])
+            self.frames_shown = 0
+            self._shown_results = None
+
+        def _show(self, display_frame):
+            now = time.time()
+            capture_to_display.append(now - getattr(display_frame, 'timestamp', now))
+            # Glass-to-glass: capture of the OCR'd frame until its results are on screen,
+            # only counted once some of them are actually drawn
+            source_time = getattr(self.tracker, 'source_timestamp', None)
+            if (source_time is not None and source_time != self._shown_results
+                    and self.current_results):
+                self._shown_results = source_time
+                glass_to_glass.append(now - source_time)
+            self.frames_shown += 1
+            return max_frames is None or self.frames_shown < max_frames
+
+        def stop(self):
+            self.running = False
+            self.close_channels()
+            self.capture.stop()
+            if self.ocr_pool is not None:
+                self.ocr_pool.stop()
+
+    app = BenchmarkApp()
+
+    # Remember the capture timestamp of each result set handed to the tracker
+    set_results = app.tracker.set_results
+
+    def tracked_set_results(results, source_frame):
+        app.tracker.source_timestamp = getattr(source_frame, 'timestamp', None)
+        set_results(results, source_frame)
+    app.tracker.set_results = tracked_set_results
+
+    def watchdog():
+        # Stop once the recording is exhausted and in-flight work has drained
+        while app.running:
+            if app.capture.stats['captured'] and app.capture.stats['read_errors']:
+                time.sleep(drain_time)
+                app.running = False
+            time.sleep(0.05)
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    start = time.time()
+    app.start()
+    elapsed = time.time() - start
+
+    return {
+        'source': str(source),
+        'fake_ocr': fake_ocr,
+        'duration_s': round(elapsed, 3),
+        'frames_captured': app.capture.stats['captured'],
+        'frames_displayed': app.frames_shown,
+        'ocr_runs': len(samples['ocr']),
+        'throughput_fps': round(app.frames_shown / elapsed, 2) if elapsed else 0.0,
+        'ocr_fps': round(len(samples['ocr']) / elapsed, 2) if elapsed else 0.0,
+        'stages_ms': {name: percentiles(values) for name, values in samples.items()},
+        'capture_to_display_ms': percentiles(capture_to_display),
+        'glass_to_glass_ms': percentiles(glass_to_glass),
+        'drops': {'frame_channel': app.frame_channel.stats['overwritten'],
+                  'ocr_channel': app.ocr_channel.stats['overwritten'],
+                  'result_channel': app.result_channel.stats['overwritten'],
+                  'capture_no_buffer': app.capture.stats['dropped_no_buffer']},
+        'frame_selection': app.frame_selector.stats,
+        'tracking': app.tracker.stats,
+        'compositor': app.compositor.stats,
+        'thread_budget': app.thread_budget.report(),
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def compare(report, baseline, tolerance):
+    """List of regressions of report against baseline beyond tolerance"""
+    checks = [('throughput_fps', report['throughput_fps'], baseline.get('throughput_fps'), True),
+              ('glass_to_glass_ms.p95', report['glass_to_glass_ms'].get('p95'),
+               baseline.get('glass_to_glass_ms', {}).get('p95'), False),
+              ('capture_to_display_ms.p95', report['capture_to_display_ms'].get('p95'),
+               baseline.get('capture_to_display_ms', {}).get('p95'), False),
+              ('peak_rss_kb', report['peak_rss_kb'], baseline.get('peak_rss_kb'), False)]
+    for name, stats in report['stages_ms'].items():
+        checks.append((f'stages_ms.{name}.p95', stats.get('p95'),
+                       baseline.get('stages_ms', {}).get(name, {}).get('p95'), False))
+
+    regressions = []
+    for name, value, reference, higher_is_better in checks:
+        if value is None or not reference:
+            continue
+        change = (value - reference) / reference
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append({'metric': name, 'baseline': reference, 'value': value,
+                                'change_pct': round(change * 100, 1)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='video file or directory of images')
+    parser.add_argument('--fake-ocr', action='store_true', help='use deterministic fake OCR')
+    parser.add_argument('--ocr-latency', type=float, default=0.15)
+    parser.add_argument('--translate-latency', type=float, default=0.05)
+    parser.add_argument('--fps', type=float, default=config.CAMERA_FPS)
+    parser.add_argument('--max-frames', type=int)
+    parser.add_argument('--thread-profile', default=config.THREAD_PROFILE,
+                        choices=sorted(config.THREAD_PROFILES))
+    parser.add_argument('--output', help='write JSON report to this file')
+    parser.add_argument('--baseline', help='compare against this JSON report')
+    parser.add_argument('--save-baseline', help='write report as new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    config.CAMERA_FPS = args.fps
+    config.THREAD_PROFILE = args.thread_profile
+    report = run_benchmark(args.source, fake_ocr=args.fake_ocr, ocr_latency=args.ocr_latency,
+                           translate_latency=args.translate_latency, max_frames=args.max_frames)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + '\n')
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
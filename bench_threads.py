@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare pipeline throughput under each thread-budget profile
+
+Runs bench_pipeline.py once per profile in a fresh process (CPU affinity,
+OpenMP and torch thread pools are process-wide and fixed once torch is
+loaded) and prints display and OCR throughput, OCR latency and the
+effective per-stage configuration. With --fake-ocr the OCR stage sleeps
+instead of computing, so only capture and display placement is measured.
+
+Usage:
+    python3 bench_threads.py recording.mp4 --max-frames 600
+    python3 bench_threads.py frames/ --profiles balanced isolated shared
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import config
+
+def run_profile(source, profile, extra_args):
+    handle, path = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        # Run from the script directory, so the source path must not be relative
+        subprocess.run([sys.executable, 'bench_pipeline.py', os.path.abspath(source),
+                        '--thread-profile', profile,
+                        '--output', path] + extra_args,
+                       check=True, stdout=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+def summarize(profile, report):
+    ocr = report['stages_ms'].get('ocr', {})
+    stages = report['thread_budget']['stages']
+    return {'profile': profile,
+            'throughput_fps': report['throughput_fps'],
+            'ocr_fps': report['ocr_fps'],
+            'ocr_p50_ms': ocr.get('p50'),
+            'ocr_p95_ms': ocr.get('p95'),
+            'glass_to_glass_p95_ms': report['glass_to_glass_ms'].get('p95'),
+            'stages': {stage: spec.get('effective') or {'cores': spec['cores']}
+                       for stage, spec in stages.items()}}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='video file or directory of images')
+    parser.add_argument('--profiles', nargs='+', default=sorted(config.THREAD_PROFILES),
+                        choices=sorted(config.THREAD_PROFILES))
+    parser.add_argument('--max-frames', type=int, default=300)
+    parser.add_argument('--fake-ocr', action='store_true', help='use deterministic fake OCR')
+    args = parser.parse_args()
+
+    extra_args = ['--max-frames', str(args.max_frames)]
+    if args.fake_ocr:
+        extra_args.append('--fake-ocr')
+    for profile in args.profiles:
+        print(json.dumps(summarize(profile, run_profile(args.source, profile, extra_args))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure batched vs per-string translation with the local stub backend, and
+the async HTTP client against the local mock server (needs aiohttp)
+"""
+import time
+from layout import PassThroughAssembler
+from translate import StubTranslationBackend, TranslationProcessor
+from translation_cache import TranslationCache
+
+def make_frame(n, frame_id):
+    return [{'text': f'Sign {frame_id}-{i}', 'bbox': (10, 10 + 30 * i, 100, 20), 'confidence': 90}
+            for i in range(n)]
+
+def bench_serial(frames, latency):
+    backend = StubTranslationBackend(latency=latency)
+    start = time.time()
+    for ocr_results in frames:
+        for result in ocr_results:
+            backend.translate(result['text'], 'hi')
+    return time.time() - start, backend.calls
+
+def bench_batched(frames, latency):
+    backend = StubTranslationBackend(latency=latency)
+    processor = TranslationProcessor('hi', backend=backend, cache=TranslationCache(db_path=''))
+    processor.layout = PassThroughAssembler()  # Same N strings as the serial run
+    start = time.time()
+    for ocr_results in frames:
+        processor.process(ocr_results)
+    return time.time() - start, backend.calls
+
+def bench_async(frames, latency, error_rate=0.0, hang_rate=0.0, timeout=0.5):
+    """Time to first and last streamed result per frame with the async client"""
+    from async_translate import AsyncTranslationProcessor, HTTPTranslationClient
+    from mock_translate_server import start_mock_server
+    server = start_mock_server(latency=latency, jitter=latency / 2, error_rate=error_rate,
+                               hang_rate=hang_rate, seed=1)
+    processor = AsyncTranslationProcessor('hi', client=HTTPTranslationClient(server.url),
+                                          cache=TranslationCache(db_path=''), timeout=timeout)
+    processor.layout = PassThroughAssembler()  # One request per string
+    first, last = [], []
+    try:
+        for ocr_results in frames:
+            start = time.time()
+            arrivals = []
+            processor.submit(ocr_results, lambda results: arrivals.append(time.time() - start)
+                             ).result()
+            first.append(arrivals[0] if arrivals else 0.0)
+            last.append(time.time() - start)
+    finally:
+        processor.close()
+        server.shutdown()
+    return sum(first) / len(first), sum(last) / len(last), processor.stats, processor.breaker.stats
+
+def main():
+    latency = 0.05
+    print(f"Stub backend latency: {latency * 1000:.0f} ms per call")
+    print("=" * 60)
+    for signs in (1, 4, 8):
+        frames = [make_frame(signs, f) for f in range(10)]
+        serial_time, serial_calls = bench_serial(frames, latency)
+        batched_time, batched_calls = bench_batched(frames, latency)
+        print(f"{signs} strings/frame: serial {serial_time:.2f}s ({serial_calls} calls), "
+              f"batched {batched_time:.2f}s ({batched_calls} calls), "
+              f"speedup {serial_time / batched_time:.1f}x")
+
+    print("=" * 60)
+    print("Async HTTP client against the mock server (4 concurrent requests)")
+    frames = [make_frame(8, f) for f in range(10)]
+    for label, error_rate, hang_rate in (('healthy', 0.0, 0.0), ('flaky', 0.2, 0.1),
+                                         ('outage', 1.0, 0.0)):
+        first, last, stats, breaker = bench_async(frames, latency, error_rate, hang_rate)
+        print(f"{label:8}: first result {first * 1000:6.1f} ms, all {last * 1000:6.1f} ms/frame, "
+              f"{stats['succeeded']} ok, {stats['failed']} failed, {stats['timeouts']} timed out, "
+              f"{stats['circuit_rejected']} rejected by breaker (opened {breaker['opened']}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compile a CSV/TSV of phrases into the memory-mapped phrase table
+
+The first column holds the source text and every further column is headed
+by a target language code, e.g.:
+
+    text,hi,es
+    EXIT,निकास,SALIDA
+
+Empty cells are skipped. Files ending in .tsv are read tab-separated.
+With --sample, a text file of OCR strings (one per line) is looked up
+against the new table to show how much backend traffic it would absorb.
+
+Usage:
+    python3 build_phrase_table.py phrases.csv phrases.bin --sample seen.txt --lang hi
+"""
+import argparse
+import csv
+import os
+import time
+from phrase_table import PhraseTable, build
+
+def read_entries(path):
+    delimiter = '\t' if path.endswith('.tsv') else ','
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = csv.reader(f, delimiter=delimiter)
+        header = next(rows)
+        langs = [lang.strip() for lang in header[1:]]
+        for row in rows:
+            if not row or row[0].startswith('#'):
+                continue
+            for lang, translation in zip(langs, row[1:]):
+                if lang and translation:
+                    yield lang, row[0], translation
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', help='CSV or TSV file')
+    parser.add_argument('output', help='phrase table file to write')
+    parser.add_argument('--sample', help='text file of OCR strings to measure coverage on')
+    parser.add_argument('--lang', default='hi', help='target language for --sample')
+    args = parser.parse_args()
+
+    count = build(read_entries(args.source), args.output)
+    start = time.perf_counter()
+    table = PhraseTable(args.output)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"{count} entries, {os.path.getsize(args.output)} bytes, loads in {load_ms:.2f} ms")
+
+    if args.sample:
+        with open(args.sample, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        start = time.perf_counter()
+        for text in texts:
+            table.lookup(text, args.lang)
+        lookup_us = (time.perf_counter() - start) / max(len(texts), 1) * 1e6
+        stats = table.stats
+        print(f"{len(texts)} sample strings: {stats['table_hits']} table hits, "
+              f"{stats['passthrough']} passthrough, {table.absorbed():.1%} absorbed, "
+              f"{lookup_us:.1f} us/lookup")
+    table.close()
+
+if __name__ == "__main__":
+    main()
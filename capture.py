@@ -1,45 +1,299 @@
 import cv2
 import threading
 import time
+import sys
+import os
+import numpy as np
+import config
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+class FrameView(np.ndarray):
+    """Read-only view of a capture buffer tagged with sequence number and timestamp
+
+    In YUYV and MJPEG capture modes the view is the grayscale luma plane and
+    `raw` holds the camera buffer it came from, for CaptureThread.to_bgr.
+    """
+    def __array_finalize__(self, obj):
+        self.seq = getattr(obj, 'seq', -1)
+        self.timestamp = getattr(obj, 'timestamp', 0.0)
+        self.raw = getattr(obj, 'raw', None)
+        self.pixel_format = getattr(obj, 'pixel_format', 'bgr')
+
+class ImageFolderCapture:
+    """VideoCapture-compatible source that replays a directory of images in name order"""
+    def __init__(self, path):
+        self.files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = -1
+
+    def grab(self):
+        self.index += 1
+        return self.index < len(self.files)
+
+    def retrieve(self, image=None):
+        if not 0 <= self.index < len(self.files):
+            return False, None
+        frame = cv2.imread(self.files[self.index])
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def release(self):
+        self.index = len(self.files)
+
+class RawYUYVCapture:
+    """VideoCapture-compatible source for raw packed YUYV 4:2:2 files
+
+    Stands in for a camera delivering YUYV, so the luma capture path can be
+    exercised without hardware. Record one with
+    `ffmpeg -i in.mp4 -s 640x480 -pix_fmt yuyv422 -f rawvideo out.yuv`;
+    the frame size is CAMERA_WIDTH x CAMERA_HEIGHT. Like cv2.VideoCapture,
+    frames are converted to BGR unless CAP_PROP_CONVERT_RGB is set to 0.
+    """
+    def __init__(self, path, width=None, height=None):
+        self.width = config.CAMERA_WIDTH if width is None else width
+        self.height = config.CAMERA_HEIGHT if height is None else height
+        self.frame_bytes = self.width * self.height * 2
+        self.file = open(path, 'rb')
+        self.frames = os.path.getsize(path) // self.frame_bytes
+        self.convert_rgb = True
+        self.index = -1
+
+    def grab(self):
+        self.index += 1
+        return self.index < self.frames
+
+    def retrieve(self, image=None):
+        if not 0 <= self.index < self.frames:
+            return False, None
+        raw = image
+        if (self.convert_rgb or raw is None or raw.nbytes != self.frame_bytes
+                or not raw.flags.c_contiguous):
+            raw = np.empty((self.height, self.width * 2), dtype=np.uint8)
+        self.file.seek(self.index * self.frame_bytes)
+        if self.file.readinto(memoryview(raw).cast('B')) != self.frame_bytes:
+            return False, None
+        if self.convert_rgb:
+            return True, cv2.cvtColor(raw.reshape(self.height, self.width, 2),
+                                      cv2.COLOR_YUV2BGR_YUYV)
+        return True, raw
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_COUNT: self.frames,
+                cv2.CAP_PROP_FRAME_WIDTH: self.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_POS_MSEC: max(self.index, 0) * 1000.0 / config.CAMERA_FPS,
+                cv2.CAP_PROP_CONVERT_RGB: float(self.convert_rgb)}.get(prop, 0)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_CONVERT_RGB:
+            self.convert_rgb = bool(value)
+            return True
+        return False
+
+    def isOpened(self):
+        return not self.file.closed and self.frames > 0
+
+    def release(self):
+        self.file.close()
+
+def open_source(src):
+    """Open a camera index, video file, raw .yuv file or image directory"""
+    if isinstance(src, str) and os.path.isdir(src):
+        return ImageFolderCapture(src)
+    if isinstance(src, str) and src.lower().endswith('.yuv'):
+        return RawYUYVCapture(src)
+    return cv2.VideoCapture(src)
 
 class CaptureThread(threading.Thread):
-    def __init__(self, src=0, width=640, height=480):
+    """Camera reader that decodes into a ring of preallocated frame buffers
+
+    Frames are handed out as read-only views instead of copies. A buffer
+    is reused only once nothing references it any more: every view (and
+    every slice of a view) holds a reference to its owning buffer, so the
+    buffer's reference count tells us when downstream stages are done.
+
+    With pixel_format 'yuyv' or 'mjpeg' the camera is asked for that
+    format without colour conversion. Frames are then the grayscale luma
+    plane (a strided view of the YUYV buffer, or a grayscale-only JPEG
+    decode) which OCR, frame selection and tracking use as-is; to_bgr
+    builds a colour image only for frames that are displayed. Sources that
+    ignore the request fall back to BGR.
+    """
+    def __init__(self, src=0, width=640, height=480, fps=None, ring_size=None,
+                 pixel_format=None, thread_budget=None):
         super().__init__(daemon=True)
-        self.cap = cv2.VideoCapture(src)
+        self.thread_budget = thread_budget
+        self.cap = open_source(src)
+        self.fps = config.CAMERA_FPS if fps is None else fps
+        ring_size = config.CAPTURE_RING_SIZE if ring_size is None else ring_size
+        self.pixel_format = config.CAPTURE_FORMAT if pixel_format is None else pixel_format
         
         # Optimized settings for Pi
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self.cap.set(cv2.CAP_PROP_FPS, 15)  # Lower FPS for Pi
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)  # Lower FPS for Pi
         self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer
+        if self.pixel_format in ('yuyv', 'mjpeg'):
+            fourcc = 'YUYV' if self.pixel_format == 'yuyv' else 'MJPG'
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or width
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height
         
-        self.lock = threading.Lock()
+        shape = ((self.height, self.width * 2) if self.pixel_format == 'yuyv'
+                 else (self.height, self.width, 3))
+        self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(ring_size)]
+        self._free_refcount = sys.getrefcount(self._buffers[0])
+        self._next_slot = 0
+
+        self.lock = threading.Condition()
         self.frame = None
+        self.seq = 0
         self.running = True
         self.last_frame_time = 0
+        self.stats = {'captured': 0, 'dropped_no_buffer': 0, 'read_errors': 0,
+                      'bytes_captured': 0, 'decode_seconds': 0.0,
+                      'bgr_conversions': 0, 'bgr_bytes': 0, 'bgr_seconds': 0.0}
+
+    def _acquire_slot(self):
+        """Index of a buffer no longer referenced downstream, or None"""
+        for offset in range(len(self._buffers)):
+            slot = (self._next_slot + offset) % len(self._buffers)
+            if sys.getrefcount(self._buffers[slot]) <= self._free_refcount:
+                self._next_slot = (slot + 1) % len(self._buffers)
+                return slot
+        return None
+        
+    def _view(self, buffer):
+        """Frame handed downstream for a filled capture buffer"""
+        if self.pixel_format != 'bgr' and buffer.ndim == 3 and buffer.shape[2] == 3:
+            print(f"Capture: source ignored {self.pixel_format.upper()} request, using BGR")
+            self.pixel_format = 'bgr'
+        if self.pixel_format == 'yuyv':
+            # Y0 U Y1 V: every other byte is luma, so this is a view, not a copy
+            view = buffer.reshape(self.height, self.width * 2)[:, 0::2].view(FrameView)
+        elif self.pixel_format == 'mjpeg':
+            start = time.perf_counter()
+            gray = cv2.imdecode(buffer.reshape(-1), cv2.IMREAD_GRAYSCALE)
+            self.stats['decode_seconds'] += time.perf_counter() - start
+            if gray is None:
+                return None
+            view = gray.view(FrameView)
+        else:
+            return buffer.view(FrameView)
+        view.raw = buffer
+        view.pixel_format = self.pixel_format
+        return view
+
+    def to_bgr(self, frame):
+        """BGR image of a captured frame, converting from the raw buffer if needed"""
+        if frame.pixel_format == 'bgr' or frame.raw is None:
+            return frame
+        start = time.perf_counter()
+        if frame.pixel_format == 'yuyv':
+            bgr = cv2.cvtColor(frame.raw.reshape(self.height, self.width, 2),
+                               cv2.COLOR_YUV2BGR_YUYV)
+        else:
+            bgr = cv2.imdecode(frame.raw.reshape(-1), cv2.IMREAD_COLOR)
+        self.stats['bgr_seconds'] += time.perf_counter() - start
+        self.stats['bgr_conversions'] += 1
+        self.stats['bgr_bytes'] += frame.raw.nbytes + bgr.nbytes
+        view = bgr.view(FrameView)
+        view.seq = frame.seq
+        view.timestamp = frame.timestamp
+        view.pixel_format = 'bgr'
+        return view
         
     def run(self):
+        if self.thread_budget is not None:
+            self.thread_budget.apply('capture')
+        interval = 1.0 / self.fps
         while self.running:
-            ret, frame = self.cap.read()
-            if not ret:
+            # Sleep until the next frame is due instead of spinning on read()
+            remaining = self.last_frame_time + interval - time.time()
+            if remaining > 0:
+                time.sleep(remaining)
+
+            if not self.cap.grab():
+                self.stats['read_errors'] += 1
                 time.sleep(0.01)
                 continue
+            timestamp = time.time()
+            self.last_frame_time = timestamp
                 
-            # Limit frame rate to reduce CPU load
-            current_time = time.time()
-            if current_time - self.last_frame_time < 1/15:  # 15 FPS max
+            slot = self._acquire_slot()
+            if slot is None:
+                self.stats['dropped_no_buffer'] += 1
                 continue
                 
-            self.last_frame_time = current_time
+            ret, image = self.cap.retrieve(self._buffers[slot])
+            if not ret:
+                self.stats['read_errors'] += 1
+                continue
+            if image is not self._buffers[slot]:
+                # Camera delivered a different size; adopt the decoded array as the buffer
+                self._buffers[slot] = image
+            del image
+            self.stats['bytes_captured'] += self._buffers[slot].nbytes
+
+            view = self._view(self._buffers[slot])
+            if view is None:
+                self.stats['read_errors'] += 1
+                continue
+            view.flags.writeable = False
+            view.timestamp = timestamp
             
             with self.lock:
-                self.frame = frame
+                self.seq += 1
+                view.seq = self.seq
+                self.frame = view
+                self.stats['captured'] += 1
+                self.lock.notify_all()
+            del view
                 
     def read(self):
+        """Latest frame as a read-only FrameView, or None before the first frame"""
+        with self.lock:
+            return self.frame
+
+    def read_next(self, last_seq, timeout=None):
+        """Wait for a frame newer than last_seq; None on timeout"""
         with self.lock:
-            return self.frame.copy() if self.frame is not None else None
+            self.lock.wait_for(lambda: not self.running or
+                               (self.frame is not None and self.frame.seq > last_seq), timeout)
+            if self.frame is None or self.frame.seq <= last_seq:
+                return None
+            return self.frame
             
     def stop(self):
         self.running = False
+        with self.lock:
+            self.lock.notify_all()
         if self.cap.isOpened():
             self.cap.release()
@@ -0,0 +1,68 @@
+import collections
+import threading
+import time
+
+class Channel:
+    """Latest-wins hand-off between pipeline stages
+
+    Holds at most `capacity` items. A put never blocks: when the channel is
+    full the oldest item is overwritten, so consumers always see the
+    freshest data and a slow stage cannot make the display stale. Every
+    item gets a sequence number, so a consumer can tell how many items it
+    skipped. Consumers sleep on a condition variable until an item arrives
+    or the channel is closed, instead of polling with a timeout.
+    """
+    def __init__(self, name, capacity=1):
+        self.name = name
+        self.capacity = capacity
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._seq = 0
+        self.closed = False
+        self.stats = {'put': 0, 'taken': 0, 'overwritten': 0}
+
+    def put(self, item):
+        """Publish an item; returns True if an older unread item was overwritten"""
+        with self._cond:
+            self._seq += 1
+            overwritten = len(self._items) >= self.capacity
+            if overwritten:
+                self._items.popleft()
+                self.stats['overwritten'] += 1
+            self._items.append((self._seq, item))
+            self.stats['put'] += 1
+            self._cond.notify()
+            return overwritten
+
+    def get(self, timeout=None):
+        """Oldest pending (seq, item), waiting up to timeout; None on timeout or close"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._items:
+                if self.closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            self.stats['taken'] += 1
+            return self._items.popleft()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def pending(self):
+        """Items published but not taken yet"""
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def seq(self):
+        """Sequence number of the most recently published item"""
+        return self._seq
+
+    def close(self):
+        """Wake all waiting consumers; get returns None once the channel is empty"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
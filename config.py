@@ -7,28 +7,188 @@ Optimized for Raspberry Pi performance
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_FPS = 15
+CAPTURE_RING_SIZE = 12  # Preallocated frame buffers shared with downstream stages
+CAPTURE_FORMAT = 'bgr'  # 'yuyv' or 'mjpeg': OCR gets luma directly, BGR only for display
 
 # OCR settings
 OCR_MIN_CONFIDENCE = 50  # EasyOCR percentage scale
-OCR_FRAME_SKIP = 2  # Process every 2nd frame
+OCR_FRAME_SKIP = 2  # Process every 2nd frame (fixed scheduler only)
 OCR_MIN_TEXT_SIZE = (20, 10)  # Minimum width, height for text detection
+OCR_MAX_TEXT_HEIGHT = 0.5  # Drop boxes taller than this fraction of the frame
+
+# OCR scheduling: 'adaptive' paces OCR from measured latency, load and
+# temperature; 'fixed' submits every OCR_FRAME_SKIP-th frame
+OCR_SCHEDULER = 'adaptive'
+SCHED_TARGET_UTILIZATION = 0.9  # Fraction of OCR capacity to keep busy
+SCHED_MAX_INTERVAL = 3.0  # Longest gap between OCR submissions in seconds
+SCHED_THERMAL_PATH = '/sys/class/thermal/thermal_zone0/temp'
+SCHED_SOFT_TEMP = 70.0  # Start backing off above this SoC temperature (C)
+SCHED_HARD_TEMP = 80.0  # Full back-off at this temperature (Pi throttles at 80-85)
+SCHED_THERMAL_STRATEGY = 'both'  # 'frequency', 'resolution' or 'both'
+SCHED_MAX_BACKOFF = 3.0  # Interval multiplier at the hard temperature
+SCHED_MIN_SCALE = 0.6  # OCR resolution scale at the hard temperature
+SCHED_LOAD_HIGH = 1.5  # Per-core load average above which OCR slows down
+
+# Warm up the OCR model on a synthetic image while the camera feed is already shown
+OCR_WARMUP = True
+
+# OCR engine: 'easyocr' (PyTorch) or 'onnx' (ONNX Runtime, models from export_onnx.py)
+OCR_BACKEND = 'easyocr'
+OCR_ONNX_DIR = 'models'
+OCR_ONNX_INT8 = False  # Use the int8-quantized models (*.int8.onnx)
+OCR_ONNX_THREADS = 2  # ONNX Runtime intra-op threads per OCR process
+
+# Time-budgeted OCR: recognize detected regions in priority order (centre,
+# size, novelty, detector confidence) until the per-frame budget runs out and
+# stream each chunk to translation; leftovers get a bonus next cycle
+OCR_FRAME_BUDGET = None  # Seconds per frame from OCR start, e.g. 0.25; None disables
+OCR_BUDGET_CHUNK = 2  # Regions per recognizer call in budgeted mode
+OCR_PRIORITY_WEIGHTS = {'centre': 0.4, 'size': 0.2, 'novelty': 0.3, 'confidence': 0.1}
+OCR_PRIORITY_CARRY = 0.5  # Priority bonus for regions left over last cycle
+
+# OCR worker processes (0 runs OCR in a single thread of the main process)
+OCR_WORKERS = 0
+OCR_RING_SLOTS = 4  # Shared-memory frame buffers, at least OCR_WORKERS + 1
+OCR_WORKER_START_TIMEOUT = 180  # Seconds to wait for a worker's model; the app then uses a thread, the server exits
+
+# Multi-stream server mode (server.py)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_OCR_WORKERS = 2  # Shared OCR model processes for all streams
+SERVER_TRANSLATION_WORKERS = 2
+SERVER_CLIENT_SOURCE_TIMEOUT = 5.0  # Client gives up after this long without a readable frame
+
+# Multi-resolution OCR: run the text detector on a downscaled copy of the
+# frame and recognize the detected crops at native resolution
+OCR_DETECT_SCALE = 1.0  # e.g. 0.5 to detect at 320x240; 1.0 disables
+OCR_DETECT_GRAYSCALE = True  # Detect on grayscale (saves a color conversion)
+OCR_DETECT_MARGIN = 2  # Pixels added around mapped-back boxes
+OCR_SMALL_TEXT_HEIGHT = 8  # Re-detect at full size if a box is shorter (detector pixels)
+
+# OCR recognition cache settings (skip recognizer on repeated crops)
+OCR_CACHE_ENABLED = True
+OCR_CACHE_SIZE = 256  # Maximum cached crops
+OCR_CACHE_MAX_AGE = 60  # Seconds before a cached crop is re-recognized
+OCR_CACHE_HASH_SIZE = (32, 8)  # Difference hash grid, width x height
+
+# Frame selection settings (skip OCR on unchanged or blurry frames)
+FRAME_SELECT_ENABLED = True
+FRAME_SELECT_SIZE = (64, 48)  # Downsampled width, height used for comparison
+FRAME_SELECT_DIFF_THRESHOLD = 6.0  # Mean absolute gray difference (0-255)
+FRAME_SELECT_SHARPNESS_THRESHOLD = 60.0  # Laplacian variance on downsampled frame
+FRAME_SELECT_MAX_INTERVAL = 2.0  # Re-OCR unchanged scene after this many seconds
+
+# Overlay tracking settings (move bboxes between OCR passes)
+TRACKING_ENABLED = True
+TRACK_SCALE = 0.5  # Downscale factor for optical flow
+TRACK_MAX_FEATURES = 20  # Corners tracked per result
+TRACK_MIN_FEATURES = 3  # Fewer at the start: drawn untracked; fewer later: track dropped
+
+# Temporal fusion of OCR results before translation
+FUSION_ENABLED = True
+FUSION_IOU = 0.3  # Minimum bbox overlap to match a detection to a track
+FUSION_MIN_HITS = 2  # OCR passes before a track's text is translated
+FUSION_MIN_SHARE = 0.6  # Winning text's share of the confidence-weighted vote
+FUSION_DECAY = 0.7  # Weight kept by older votes on each new reading
+FUSION_MAX_MISSES = 2  # OCR passes a track survives without a detection
+FUSION_MAX_TEXTS = 4096  # Distinct strings remembered for the avoided-translation count
 
 # Threading settings
-MAX_QUEUE_SIZE = 2
-WORKER_TIMEOUT = 0.1
+MAX_QUEUE_SIZE = 2  # OCR results held for translation; a full channel drops the oldest
+WORKER_TIMEOUT = 0.1  # Capture/server wait before re-checking for shutdown
+
+# Thread budget: cores (indices into the usable CPUs, wrapping) and thread
+# counts per stage. OCR threads size torch's intra-op pool, display threads
+# OpenCV's pool, which is process-wide and so also used by OpenCV calls in
+# OCR; 'off' leaves scheduling to the OS
+THREAD_PROFILE = 'balanced'
+THREAD_PROFILES = {
+    'off': None,
+    # OCR gets three cores; capture, translation and display share core 0
+    'balanced': {'capture': {'cores': (0,)}, 'translation': {'cores': (0,)},
+                 'display': {'cores': (0,), 'threads': 1},
+                 'ocr': {'cores': (1, 2, 3), 'threads': 3}},
+    # Display keeps a core of its own for smooth output; OCR gets two
+    'isolated': {'capture': {'cores': (0,)}, 'translation': {'cores': (0,)},
+                 'display': {'cores': (1,), 'threads': 1},
+                 'ocr': {'cores': (2, 3), 'threads': 2}},
+    # Every stage may use every core, with pools sized to the core count
+    'shared': {'capture': {'cores': (0, 1, 2, 3)}, 'translation': {'cores': (0, 1, 2, 3)},
+               'display': {'cores': (0, 1, 2, 3), 'threads': 4},
+               'ocr': {'cores': (0, 1, 2, 3), 'threads': 4}},
+    # Two cores stay idle to keep the Pi cool on battery
+    'low_power': {'capture': {'cores': (0,)}, 'translation': {'cores': (0,)},
+                  'display': {'cores': (0,), 'threads': 1},
+                  'ocr': {'cores': (1,), 'threads': 1}},
+}
 
 # Translation settings
 TRANSLATION_CACHE_SIZE = 512
-TRANSLATION_CACHE_TIMEOUT = 300  # 5 minutes
+TRANSLATION_CACHE_TIMEOUT = 300  # Seconds a translation in use is served before re-translating
+TRANSLATION_NEGATIVE_CACHE_TIMEOUT = 30  # Seconds before retrying a failed string
+TRANSLATION_CACHE_DB = 'translation_cache.db'  # sqlite file, None for memory only
+TRANSLATION_CACHE_DB_TTL = 7 * 24 * 3600  # Max age of a persisted translation loaded on a memory miss (e.g. after restart)
+TRANSLATION_BACKEND = 'google'  # 'google', 'stub' (local, no network) or 'http' (async)
+TRANSLATION_STUB_LATENCY = 0.2  # Seconds per stub backend call
+TRANSLATION_DEBOUNCE_WINDOW = 0.05  # Seconds to wait for newer OCR results; only the newest set is translated
+TRANSLATION_BATCH_SEPARATOR = '\n'
+
+# Offline phrase table checked before the cache and backend (build_phrase_table.py)
+PHRASE_TABLE_ENABLED = True
+PHRASE_TABLE_PATH = 'phrases.bin'  # Missing file leaves only the passthrough rules
+
+# Async HTTP translation client (TRANSLATION_BACKEND = 'http')
+TRANSLATION_HTTP_URL = 'http://127.0.0.1:5000/translate'  # LibreTranslate-compatible
+TRANSLATION_HTTP_CONCURRENCY = 4  # Pooled connections and concurrent requests
+TRANSLATION_HTTP_TIMEOUT = 2.0  # Deadline per string, including the wait for a slot
+TRANSLATION_BREAKER_FAILURES = 5  # Consecutive failures that open the circuit
+TRANSLATION_BREAKER_RESET = 10.0  # Seconds before a trial request is let through
+
+# Layout assembly: translate whole lines or blocks instead of OCR fragments
+LAYOUT_MODE = 'blocks'  # 'blocks', 'lines' or 'off'
+LAYOUT_WORD_GAP = 1.0  # Max horizontal gap between words, in text heights
+LAYOUT_LINE_OVERLAP = 0.5  # Min vertical overlap of words on one line (fraction)
+LAYOUT_LINE_GAP = 0.6  # Max vertical gap between lines of a block, in line heights
+LAYOUT_HEIGHT_RATIO = 1.6  # Max text height ratio within a line or block
+
+# Metrics settings
+METRICS_ENABLED = False  # Disabled uses a no-op sink with no per-frame cost
+METRICS_HUD = False  # Draw FPS/latency/drops on the displayed frame
+METRICS_HTTP_PORT = None  # e.g. 9108 to serve Prometheus text on localhost
+METRICS_TEXTFILE = None  # e.g. '/var/lib/node_exporter/arglasses.prom'
+METRICS_EXPORT_INTERVAL = 5  # Seconds between textfile writes
+METRICS_PREFIX = 'arglasses_'
 
 # Display settings
 FONT_SCALE = 0.5
 FONT_THICKNESS = 1
+LABEL_TTF_ENABLED = True  # Render labels with a TrueType font via Pillow
+LABEL_FONT_PATHS = (  # First existing font is used; must cover the target script
+    '/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf',
+    '/usr/share/fonts/truetype/freefont/FreeSans.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+)
+LABEL_FONT_SIZE = 16
+LABEL_CACHE_SIZE = 128  # Rendered label sprites kept in memory
+LABEL_BG_ALPHA = 1.0  # Label background opacity (below 1.0 blends with the video)
+OVERLAY_TILE_CACHE = 64  # Rendered result tiles (box plus labels) kept in memory
+
+# Display output: 'window' (cv2.imshow), 'framebuffer' (e.g. the glasses'
+# /dev/fb1), 'shm' (shared memory for another process), 'video' (encoded
+# file) or 'null' (discard, for benchmarking)
+DISPLAY_SINK = 'window'
+DISPLAY_WINDOW_NAME = 'AR Glasses - Press q to quit'
+DISPLAY_FRAMEBUFFER = '/dev/fb0'
+DISPLAY_SHM_NAME = 'arglasses_display'
+DISPLAY_VIDEO_PATH = 'display.mp4'
+DISPLAY_VIDEO_FOURCC = 'mp4v'
+
 BBOX_COLOR = (0, 255, 0)  # Green
 ORIGINAL_TEXT_COLOR = (0, 255, 0)  # Green
 TRANSLATED_TEXT_COLOR = (0, 255, 255)  # Yellow
 
-# Performance settings for Pi
+# Performance settings for Pi (OpenMP threads are set by the thread budget)
 import os
-os.environ['OMP_THREAD_LIMIT'] = '2'
 os.environ['OPENCV_VIDEOIO_PRIORITY_V4L2'] = '1'
@@ -1,11 +1,16 @@
 import cv2
 import numpy as np
+from collections import OrderedDict
+import config
+from labels import create_label_renderer
 
 class DisplayProcessor:
     def __init__(self):
         self.font = cv2.FONT_HERSHEY_SIMPLEX
         self.font_scale = 0.5
         self.thickness = 1
+        # TrueType sprite renderer for non-Latin labels; None falls back to putText
+        self.labels = create_label_renderer()
         
     def _get_text_size(self, text, font_scale=None):
         if font_scale is None:
@@ -14,6 +19,12 @@ class DisplayProcessor:
         
     def _draw_text_with_background(self, img, text, pos, color, bg_color):
         x, y = pos
+        if self.labels is not None:
+            # Sprite is anchored like the putText box: baseline at y, 4px below
+            height = self.labels.sprite(text, color, bg_color)[0].shape[0]
+            self.labels.blit(img, text, (x - 2, y + 4 - height), color, bg_color)
+            return
+            
         text_size = self._get_text_size(text)
         
         # Draw background rectangle
@@ -23,30 +34,157 @@ class DisplayProcessor:
         # Draw text
         cv2.putText(img, text, (x, y), self.font, self.font_scale, color, self.thickness)
         
+    def draw_hud(self, frame, lines):
+        """Draw performance HUD lines in the top-left corner"""
+        if not lines:
+            return frame
+        if not frame.flags.writeable:
+            frame = frame.copy()
+        y = 16
+        for line in lines:
+            self._draw_text_with_background(frame, line, (6, y), (255, 255, 255), (0, 0, 0))
+            y += 18
+        return frame
+        
+    def _label_rect(self, text, pos):
+        """Area (x0, y0, x1, y1) covered by a label drawn at pos"""
+        x, y = pos
+        if self.labels is not None:
+            width, height = self.labels.size(text)
+            return x - 2, y + 4 - height, x - 2 + width, y + 4
+        text_size = self._get_text_size(text)
+        return x - 2, y - text_size[1] - 4, x + text_size[0] + 3, y + 5
+        
+    def _result_labels(self, result):
+        """(text, pos, color) of each label drawn for a result"""
+        x, y, w, h = result['bbox']
+        original = result['original']
+        translated = result['translated']
+        
+        # Original text with confidence above the box, translation below it
+        labels = [(f"{original} ({result['confidence']}%)", (x, y-10), (0, 255, 0))]
+        if translated != original:
+            labels.append((translated, (x, y+h+20), (0, 255, 255)))
+        return labels
+        
+    def draw_result(self, img, result, offset=(0, 0)):
+        """Draw one result's box and labels, shifted by -offset"""
+        ox, oy = offset
+        x, y, w, h = result['bbox']
+        cv2.rectangle(img, (x - ox, y - oy), (x + w - ox, y + h - oy), (0, 255, 0), 2)
+        for text, (lx, ly), color in self._result_labels(result):
+            self._draw_text_with_background(img, text, (lx - ox, ly - oy), color, (0, 0, 0))
+            
+    def result_rect(self, result):
+        """Area (x0, y0, x1, y1) covered by draw_result"""
+        x, y, w, h = result['bbox']
+        rects = [(x - 1, y - 1, x + w + 2, y + h + 2)]
+        rects += [self._label_rect(text, pos) for text, pos, _ in self._result_labels(result)]
+        return (min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects))
+        
     def overlay(self, frame, results):
         if not results:
             return frame
             
         output = frame.copy()
+        for result in results:
+            self.draw_result(output, result)
+        return output
+
+class OverlayCompositor:
+    """Persistent overlay layer blended onto frames through dirty rectangles
+
+    Each result is rendered once into a tile (its box and labels with an
+    alpha channel), keyed by its text, confidence and box size, so a
+    result that the tracker only moves is not redrawn. The layer is
+    rebuilt only when the results change; every frame then blends just
+    the tiles' rectangles. Frames that are writable (e.g. BGR converted
+    from luma capture) are composed in place, read-only capture buffers
+    are copied first.
+    """
+    def __init__(self, display_processor=None, cache_size=None):
+        self.display = DisplayProcessor() if display_processor is None else display_processor
+        self.cache_size = config.OVERLAY_TILE_CACHE if cache_size is None else cache_size
+        self._tiles = OrderedDict()
+        self._layer = []  # (bgr, alpha, opaque, x, y) of each placed tile
+        self._layer_key = None
+        self.stats = {'frames': 0, 'layer_updates': 0, 'tile_renders': 0, 'tile_hits': 0,
+                      'frame_copies': 0, 'dirty_pixels': 0, 'frame_pixels': 0}
+        
+    def _render_tile(self, result):
+        """Tile of a result drawn with its bbox at the origin, and its offset"""
+        x0, y0, x1, y1 = self.display.result_rect(result)
+        shape = (y1 - y0, x1 - x0, 3)
+        
+        # Drawing over black and over white recovers coverage: alpha = 1 - (white - black)
+        black = np.zeros(shape, dtype=np.uint8)
+        white = np.full(shape, 255, dtype=np.uint8)
+        self.display.draw_result(black, result, (x0, y0))
+        self.display.draw_result(white, result, (x0, y0))
+        alpha = 255 - (white.astype(np.int16) - black).max(axis=2)
+        alpha = np.clip(alpha, 0, 255).astype(np.uint8)
+        opaque = bool(np.isin(alpha, (0, 255)).all())
+        return black, alpha, opaque, x0, y0
         
+    def _tile(self, result):
+        x, y, w, h = result['bbox']
+        key = (result['original'], result['translated'], result['confidence'], w, h)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            self.stats['tile_hits'] += 1
+            return tile
+        tile = self._render_tile(dict(result, bbox=(0, 0, w, h)))
+        self.stats['tile_renders'] += 1
+        self._tiles[key] = tile
+        if len(self._tiles) > self.cache_size:
+            self._tiles.popitem(last=False)
+        return tile
+        
+    def _update_layer(self, results):
+        key = [(r['original'], r['translated'], r['confidence'], tuple(r['bbox']))
+               for r in results]
+        if key == self._layer_key:
+            return
+        self._layer_key = key
+        self.stats['layer_updates'] += 1
+        self._layer = []
         for result in results:
-            bbox = result['bbox']
-            x, y, w, h = bbox
-            confidence = result['confidence']
-            original = result['original']
-            translated = result['translated']
-            
-            # Draw bounding box
-            cv2.rectangle(output, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            
-            # Draw original text with confidence
-            orig_text = f"{original} ({confidence}%)"
-            self._draw_text_with_background(output, orig_text, (x, y-10), 
-                                          (0, 255, 0), (0, 0, 0))
+            bgr, alpha, opaque, dx, dy = self._tile(result)
+            x, y = result['bbox'][:2]
+            self._layer.append((bgr, alpha, opaque, x + dx, y + dy))
             
-            # Draw translated text
-            if translated != original:
-                self._draw_text_with_background(output, translated, (x, y+h+20), 
-                                              (0, 255, 255), (0, 0, 0))
-                
+    def _blend(self, output, bgr, alpha, opaque, x, y):
+        """Blend one tile onto output, clipped to the frame; pixels touched"""
+        h, w = alpha.shape
+        frame_h, frame_w = output.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return 0
+        src = bgr[y0 - y:y1 - y, x0 - x:x1 - x]
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = output[y0:y1, x0:x1]
+        if opaque:
+            cv2.copyTo(src, a, roi)  # Writes into the roi view in place
+        else:
+            # Tile colours are premultiplied by alpha (drawn over black)
+            a16 = a[:, :, None].astype(np.uint16)
+            roi[:] = (src + roi.astype(np.uint16) * (255 - a16) // 255).astype(np.uint8)
+        return (x1 - x0) * (y1 - y0)
+        
+    def compose(self, frame, results):
+        """Frame with the overlay for results blended on"""
+        self.stats['frames'] += 1
+        self.stats['frame_pixels'] += frame.shape[0] * frame.shape[1]
+        self._update_layer(results)
+        if not self._layer:
+            return frame
+        output = frame
+        if not frame.flags.writeable:
+            output = frame.copy()
+            self.stats['frame_copies'] += 1
+        for tile in self._layer:
+            self.stats['dirty_pixels'] += self._blend(output, *tile)
         return output
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Export EasyOCR's detector and recognizer to ONNX, optionally quantized to int8
+
+Writes detector.onnx, recognizer.onnx and recognizer.json (character set)
+to the output directory; with --int8 also detector.int8.onnx and
+recognizer.int8.onnx using dynamic (weight-only) quantization, which needs
+no calibration images. Select the result with OCR_BACKEND = 'onnx'.
+
+Usage:
+    python3 export_onnx.py --out models --int8
+"""
+import argparse
+import json
+import os
+import config
+
+def export(out_dir, languages=('en',), opset=13):
+    import torch
+    import easyocr
+
+    reader = easyocr.Reader(list(languages), gpu=False)
+    os.makedirs(out_dir, exist_ok=True)
+
+    detector = reader.detector.module if hasattr(reader.detector, 'module') else reader.detector
+    detector.eval()
+    dummy = torch.randn(1, 3, config.CAMERA_HEIGHT, config.CAMERA_WIDTH)
+    torch.onnx.export(detector, dummy, os.path.join(out_dir, 'detector.onnx'),
+                      input_names=['image'], output_names=['scores', 'features'],
+                      dynamic_axes={'image': {2: 'height', 3: 'width'},
+                                    'scores': {1: 'height', 2: 'width'},
+                                    'features': {2: 'height', 3: 'width'}},
+                      opset_version=opset)
+
+    class Recognizer(torch.nn.Module):
+        # EasyOCR's recognizer takes an unused text argument; hide it from the graph
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            return self.model(image, None)
+
+    recognizer = reader.recognizer.module if hasattr(reader.recognizer, 'module') else reader.recognizer
+    recognizer.eval()
+    dummy = torch.randn(2, 1, 64, 256)
+    torch.onnx.export(Recognizer(recognizer), dummy, os.path.join(out_dir, 'recognizer.onnx'),
+                      input_names=['image'], output_names=['logits'],
+                      dynamic_axes={'image': {0: 'batch', 3: 'width'},
+                                    'logits': {0: 'batch', 1: 'steps'}},
+                      opset_version=opset)
+
+    with open(os.path.join(out_dir, 'recognizer.json'), 'w', encoding='utf-8') as f:
+        json.dump({'characters': reader.character, 'image_height': 64,
+                   'languages': list(languages)}, f, ensure_ascii=False)
+
+def quantize(out_dir):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    for name in ('detector', 'recognizer'):
+        quantize_dynamic(os.path.join(out_dir, name + '.onnx'),
+                         os.path.join(out_dir, name + '.int8.onnx'),
+                         weight_type=QuantType.QUInt8)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default=config.OCR_ONNX_DIR, help='output directory')
+    parser.add_argument('--lang', action='append', help='EasyOCR language (repeatable)')
+    parser.add_argument('--int8', action='store_true', help='also write int8-quantized models')
+    parser.add_argument('--opset', type=int, default=13)
+    args = parser.parse_args()
+
+    export(args.out, tuple(args.lang or ['en']), args.opset)
+    if args.int8:
+        quantize(args.out)
+    for name in sorted(os.listdir(args.out)):
+        size = os.path.getsize(os.path.join(args.out, name)) / 1e6
+        print(f"{name:24} {size:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+import time
+import config
+
+class PassThroughSelector:
+    """Frame selector that submits every frame it is offered"""
+    def __init__(self):
+        self.stats = {'accepted': 0, 'skipped_unchanged': 0, 'skipped_blurry': 0}
+
+    def select(self, frame):
+        return True
+
+    def commit(self):
+        self.stats['accepted'] += 1
+
+class FrameSelector:
+    """Skip OCR on frames that are unchanged or too blurry to read
+
+    Frames are compared against the last frame that was actually submitted
+    for OCR using a downsampled grayscale difference. Sharpness is the
+    variance of the Laplacian on the same small image, so both checks
+    cost a fraction of a millisecond on the Pi.
+    """
+    def __init__(self, diff_threshold=None, sharpness_threshold=None,
+                 size=None, max_interval=None):
+        self.diff_threshold = (config.FRAME_SELECT_DIFF_THRESHOLD
+                               if diff_threshold is None else diff_threshold)
+        self.sharpness_threshold = (config.FRAME_SELECT_SHARPNESS_THRESHOLD
+                                    if sharpness_threshold is None else sharpness_threshold)
+        self.size = config.FRAME_SELECT_SIZE if size is None else size
+        self.max_interval = (config.FRAME_SELECT_MAX_INTERVAL
+                             if max_interval is None else max_interval)
+
+        self._reference = None
+        self._reference_time = 0
+        self._pending = None
+        self.last_diff = 0.0
+        self.last_sharpness = 0.0
+        self.stats = {'accepted': 0, 'skipped_unchanged': 0, 'skipped_blurry': 0}
+
+    def _signature(self, frame):
+        if len(frame.shape) == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+
+    def _sharpness(self, small):
+        return float(cv2.Laplacian(small, cv2.CV_64F).var())
+
+    def select(self, frame):
+        """Return True if frame should be sent to OCR"""
+        small = self._signature(frame)
+
+        self.last_sharpness = self._sharpness(small)
+        if self.last_sharpness < self.sharpness_threshold:
+            self.stats['skipped_blurry'] += 1
+            return False
+
+        if self._reference is not None:
+            diff = cv2.absdiff(small, self._reference)
+            self.last_diff = float(np.mean(diff))
+            stale = time.time() - self._reference_time > self.max_interval
+            if self.last_diff < self.diff_threshold and not stale:
+                self.stats['skipped_unchanged'] += 1
+                return False
+
+        self._pending = small
+        return True
+
+    def commit(self):
+        """Mark the last selected frame as submitted to OCR"""
+        if self._pending is not None:
+            self.stats['accepted'] += 1
+            self._reference = self._pending
+            self._reference_time = time.time()
+            self._pending = None
+
+def create_frame_selector():
+    if config.FRAME_SELECT_ENABLED:
+        return FrameSelector()
+    return PassThroughSelector()
@@ -0,0 +1,145 @@
+import config
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+class _FusionTrack:
+    def __init__(self, result):
+        self.bbox = result['bbox']
+        self.confidence = result['confidence']
+        self.votes = {}
+        self.hits = 0
+        self.misses = 0
+        self.emitted = None
+        self.in_pass = False  # Matched during the current, possibly partial, OCR pass
+
+    def vote(self, result, decay):
+        for text in self.votes:
+            self.votes[text] *= decay
+        text = result['text']
+        self.votes[text] = self.votes.get(text, 0.0) + max(result['confidence'], 1)
+        self.bbox = result['bbox']
+        self.confidence = result['confidence']
+        self.hits += 1
+        self.misses = 0
+        self.in_pass = True
+
+    def best(self):
+        text = max(self.votes, key=self.votes.get)
+        return text, self.votes[text] / sum(self.votes.values())
+
+class PassThroughFuser:
+    """Forward OCR results unchanged"""
+    def __init__(self):
+        self.stats = {'detections': 0, 'emitted': 0, 'translations_avoided': 0}
+        self._pass = []
+
+    def update(self, ocr_results, final=True):
+        self.stats['detections'] += len(ocr_results)
+        self.stats['emitted'] += len(ocr_results)
+        # Partial passes accumulate so the display gets everything read so far
+        self._pass.extend(ocr_results)
+        results = self._pass
+        if final:
+            self._pass = []
+        return results
+
+class ResultFuser:
+    """Fuse OCR results across frames into stable per-sign text
+
+    Detections are matched to existing tracks by bbox overlap. Each track
+    keeps confidence-weighted, decaying votes for the strings read at that
+    spot, so "EXIT", "EX1T" and "EXIT." converge on one answer. A track's
+    text is passed on only once it has won enough of the vote over enough
+    passes, and it only changes when a different reading wins the same way.
+    A pass may arrive in pieces (final=False) when OCR streams partial
+    results; misses are only counted once the pass is final.
+    """
+    def __init__(self, iou_threshold=None, min_hits=None, min_share=None,
+                 decay=None, max_misses=None):
+        self.iou_threshold = config.FUSION_IOU if iou_threshold is None else iou_threshold
+        self.min_hits = config.FUSION_MIN_HITS if min_hits is None else min_hits
+        self.min_share = config.FUSION_MIN_SHARE if min_share is None else min_share
+        self.decay = config.FUSION_DECAY if decay is None else decay
+        self.max_misses = config.FUSION_MAX_MISSES if max_misses is None else max_misses
+        self._tracks = []
+        self._seen = set()
+        self._emitted = set()
+        self.stats = {'detections': 0, 'emitted': 0, 'translations_avoided': 0}
+
+    def _associate(self, ocr_results):
+        """Greedy best-IoU matching of detections to tracks not yet matched in this pass"""
+        pairs = sorted(((iou(track.bbox, result['bbox']), t, r)
+                        for t, track in enumerate(self._tracks) if not track.in_pass
+                        for r, result in enumerate(ocr_results)), reverse=True)
+        matched_tracks, matched_results = {}, set()
+        for overlap, t, r in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in matched_tracks or r in matched_results:
+                continue
+            matched_tracks[t] = r
+            matched_results.add(r)
+        return matched_tracks, matched_results
+
+    def update(self, ocr_results, final=True):
+        """Add one OCR pass (or part of one) and return the stable results to translate"""
+        self.stats['detections'] += len(ocr_results)
+        matched_tracks, matched_results = self._associate(ocr_results)
+
+        for t, result_index in matched_tracks.items():
+            self._tracks[t].vote(ocr_results[result_index], self.decay)
+        for r, result in enumerate(ocr_results):
+            if r not in matched_results:
+                track = _FusionTrack(result)
+                track.vote(result, self.decay)
+                self._tracks.append(track)
+
+        if final:
+            for track in self._tracks:
+                if not track.in_pass:
+                    track.misses += 1
+                track.in_pass = False
+            self._tracks = [track for track in self._tracks if track.misses <= self.max_misses]
+
+        fused = []
+        for track in self._tracks:
+            if track.misses:
+                continue
+            text, share = track.best()
+            if track.hits >= self.min_hits and share >= self.min_share:
+                track.emitted = text
+            if track.emitted is not None:
+                fused.append({'text': track.emitted, 'bbox': track.bbox,
+                              'confidence': track.confidence})
+        self.stats['emitted'] += len(fused)
+        self._count_avoided(ocr_results, fused)
+        return fused
+
+    def _count_avoided(self, ocr_results, fused):
+        # A raw string that never reaches the translator is a translation saved
+        if len(self._seen) > config.FUSION_MAX_TEXTS:
+            self._seen.clear()
+            self._emitted.clear()
+        for result in fused:
+            if result['text'] not in self._emitted:
+                self._emitted.add(result['text'])
+                if result['text'] in self._seen:
+                    self.stats['translations_avoided'] -= 1
+        for result in ocr_results:
+            if result['text'] not in self._seen:
+                self._seen.add(result['text'])
+                if result['text'] not in self._emitted:
+                    self.stats['translations_avoided'] += 1
+
+def create_fuser():
+    if config.FUSION_ENABLED:
+        return ResultFuser()
+    return PassThroughFuser()
@@ -0,0 +1,101 @@
+import os
+from collections import OrderedDict
+import numpy as np
+import config
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, features
+except ImportError:  # Pillow is optional; DisplayProcessor falls back to cv2.putText
+    Image = None
+
+def find_font(candidates=None):
+    """First existing font file from the configured candidates"""
+    candidates = config.LABEL_FONT_PATHS if candidates is None else candidates
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+class LabelRenderer:
+    """Render label text once to a sprite and alpha-blend it onto frames
+
+    Each (text, color, background) triple is rasterized with a TrueType
+    font through Pillow, which can shape scripts such as Devanagari that
+    the Hershey fonts cannot draw. Sprites are kept in a bounded LRU so the
+    steady-state cost of a label is a single numpy blend.
+    """
+    def __init__(self, font_path, font_size=None, cache_size=None, bg_alpha=None, padding=3):
+        self.font_size = config.LABEL_FONT_SIZE if font_size is None else font_size
+        self.cache_size = config.LABEL_CACHE_SIZE if cache_size is None else cache_size
+        self.bg_alpha = config.LABEL_BG_ALPHA if bg_alpha is None else bg_alpha
+        self.padding = padding
+        layout = ImageFont.Layout.RAQM if features.check('raqm') else ImageFont.Layout.BASIC
+        self.font = ImageFont.truetype(font_path, self.font_size, layout_engine=layout)
+        self._sprites = OrderedDict()
+        self.stats = {'hits': 0, 'renders': 0}
+
+    def _render(self, text, color, bg_color):
+        left, top, right, bottom = self.font.getbbox(text)
+        width = max(right - left, 1) + 2 * self.padding
+        height = max(bottom - top, 1) + 2 * self.padding
+
+        mask = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(mask).text((self.padding - left, self.padding - top), text,
+                                  fill=255, font=self.font)
+        coverage = np.asarray(mask, dtype=np.float32)[:, :, None] / 255.0
+
+        # Composite text over background once, keeping colors in BGR
+        bgr = (np.array(color, dtype=np.float32) * coverage +
+               np.array(bg_color, dtype=np.float32) * (1.0 - coverage))
+        alpha = np.maximum(coverage, self.bg_alpha)
+        return bgr.astype(np.uint8), (alpha * 255).astype(np.uint8)
+
+    def sprite(self, text, color, bg_color):
+        key = (text, color, bg_color)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.stats['hits'] += 1
+            return sprite
+        sprite = self._render(text, color, bg_color)
+        self.stats['renders'] += 1
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.cache_size:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def size(self, text):
+        """Width and height of the sprite for text"""
+        left, top, right, bottom = self.font.getbbox(text)
+        return (max(right - left, 1) + 2 * self.padding,
+                max(bottom - top, 1) + 2 * self.padding)
+
+    def blit(self, frame, text, pos, color, bg_color):
+        """Blend the label with its top-left corner at pos, clipped to the frame"""
+        bgr, alpha = self.sprite(text, color, bg_color)
+        x, y = pos
+        h, w = bgr.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        src = bgr[y0 - y:y1 - y, x0 - x:x1 - x]
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = frame[y0:y1, x0:x1]
+        if self.bg_alpha >= 1.0:
+            roi[:] = src
+            return
+        a16 = a.astype(np.uint16)
+        roi[:] = ((src.astype(np.uint16) * a16 + roi.astype(np.uint16) * (255 - a16)) // 255
+                  ).astype(np.uint8)
+
+def create_label_renderer():
+    """LabelRenderer if Pillow and a TrueType font are available, else None"""
+    if Image is None or not config.LABEL_TTF_ENABLED:
+        return None
+    font_path = find_font()
+    if font_path is None:
+        print("No TrueType label font found; using Hershey fonts")
+        return None
+    return LabelRenderer(font_path)
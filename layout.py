@@ -0,0 +1,124 @@
+import numpy as np
+import config
+
+def _components(adjacent):
+    """Connected-component labels of a symmetric boolean adjacency matrix"""
+    count = len(adjacent)
+    labels = np.arange(count)
+    while True:
+        # Each box takes the smallest label among itself and its neighbours
+        neighbour = np.where(adjacent, labels[None, :], count).min(axis=1)
+        updated = np.minimum(labels, neighbour)
+        updated = updated[updated]  # Pointer jumping speeds up long chains
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def _group(boxes, labels):
+    """Union bbox (x1, y1, x2, y2) of each label group, ordered by label"""
+    groups = np.unique(labels)
+    union = np.empty((len(groups), 4), dtype=boxes.dtype)
+    for i, label in enumerate(groups):
+        members = boxes[labels == label]
+        union[i] = (members[:, 0].min(), members[:, 1].min(),
+                    members[:, 2].max(), members[:, 3].max())
+    return groups, union
+
+class PassThroughAssembler:
+    """Translate every OCR fragment on its own"""
+    def __init__(self):
+        self.stats = {'fragments': 0, 'units': 0}
+
+    def assemble(self, ocr_results):
+        self.stats['fragments'] += len(ocr_results)
+        self.stats['units'] += len(ocr_results)
+        return ocr_results
+
+class LayoutAssembler:
+    """Merge OCR fragments into reading-order lines and blocks
+
+    Fragments join a line when they overlap vertically, have similar
+    heights and the horizontal gap is under LAYOUT_WORD_GAP text heights.
+    Lines join a block when they overlap horizontally and sit within
+    LAYOUT_LINE_GAP line heights of each other. All pairwise tests run as
+    numpy matrix operations, so a cluttered frame costs well under a
+    millisecond. Each unit keeps the bbox union of its fragments and a
+    width-weighted confidence.
+    """
+    def __init__(self, mode=None, word_gap=None, line_overlap=None, line_gap=None,
+                 height_ratio=None):
+        self.mode = config.LAYOUT_MODE if mode is None else mode
+        self.word_gap = config.LAYOUT_WORD_GAP if word_gap is None else word_gap
+        self.line_overlap = config.LAYOUT_LINE_OVERLAP if line_overlap is None else line_overlap
+        self.line_gap = config.LAYOUT_LINE_GAP if line_gap is None else line_gap
+        self.height_ratio = config.LAYOUT_HEIGHT_RATIO if height_ratio is None else height_ratio
+        self.stats = {'fragments': 0, 'units': 0}
+
+    def _similar_height(self, heights):
+        ratio = heights[:, None] / np.maximum(heights[None, :], 1)
+        return (ratio <= self.height_ratio) & (ratio >= 1.0 / self.height_ratio)
+
+    def _line_labels(self, boxes):
+        heights = boxes[:, 3] - boxes[:, 1]
+        min_height = np.maximum(np.minimum(heights[:, None], heights[None, :]), 1)
+        v_overlap = (np.minimum(boxes[:, None, 3], boxes[None, :, 3]) -
+                     np.maximum(boxes[:, None, 1], boxes[None, :, 1]))
+        h_gap = (np.maximum(boxes[:, None, 0], boxes[None, :, 0]) -
+                 np.minimum(boxes[:, None, 2], boxes[None, :, 2]))
+        adjacent = ((v_overlap >= self.line_overlap * min_height) &
+                    (h_gap <= self.word_gap * min_height) &
+                    self._similar_height(heights))
+        return _components(adjacent)
+
+    def _block_labels(self, lines):
+        heights = lines[:, 3] - lines[:, 1]
+        min_height = np.maximum(np.minimum(heights[:, None], heights[None, :]), 1)
+        h_overlap = (np.minimum(lines[:, None, 2], lines[None, :, 2]) -
+                     np.maximum(lines[:, None, 0], lines[None, :, 0]))
+        v_gap = (np.maximum(lines[:, None, 1], lines[None, :, 1]) -
+                 np.minimum(lines[:, None, 3], lines[None, :, 3]))
+        adjacent = ((h_overlap > 0) & (v_gap <= self.line_gap * min_height) &
+                    self._similar_height(heights))
+        return _components(adjacent)
+
+    def assemble(self, ocr_results):
+        """Return one result per line or block, in reading order"""
+        self.stats['fragments'] += len(ocr_results)
+        if len(ocr_results) < 2:
+            self.stats['units'] += len(ocr_results)
+            return ocr_results
+
+        xywh = np.array([r['bbox'] for r in ocr_results], dtype=np.int64)
+        boxes = np.column_stack((xywh[:, :2], xywh[:, :2] + xywh[:, 2:]))
+        weights = np.maximum(xywh[:, 2], 1).astype(np.float64)
+        confidences = np.array([r['confidence'] for r in ocr_results], dtype=np.float64)
+        texts = [r['text'] for r in ocr_results]
+
+        line_of = self._line_labels(boxes)
+        line_ids, lines = _group(boxes, line_of)
+        block_of_line = (self._block_labels(lines) if self.mode == 'blocks'
+                         else np.arange(len(lines)))
+        block_of = block_of_line[np.searchsorted(line_ids, line_of)]
+        block_ids, blocks = _group(boxes, block_of)
+
+        # Reading order: blocks top to bottom then left to right; within a
+        # block by line top, within a line by left edge
+        line_top = lines[np.searchsorted(line_ids, line_of), 1]
+        units = []
+        for b in np.lexsort((blocks[:, 0], blocks[:, 1])):
+            members = np.flatnonzero(block_of == block_ids[b])
+            members = members[np.lexsort((boxes[members, 0], line_top[members]))]
+            x1, y1, x2, y2 = (int(v) for v in blocks[b])
+            confidence = np.average(confidences[members], weights=weights[members])
+            units.append({
+                'text': ' '.join(texts[i] for i in members),
+                'bbox': (x1, y1, x2 - x1, y2 - y1),
+                'confidence': int(round(confidence))
+            })
+        self.stats['units'] += len(units)
+        return units
+
+def create_assembler():
+    if config.LAYOUT_MODE in ('lines', 'blocks'):
+        return LayoutAssembler()
+    return PassThroughAssembler()
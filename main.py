@@ -1,92 +1,306 @@
 import time
 import threading
-import queue
 from capture import CaptureThread
 from ocr import OCRProcessor
 from translate import TranslationProcessor
-from display import DisplayProcessor
-import cv2
+from display import DisplayProcessor, OverlayCompositor
+from sinks import create_sink
+from frame_select import create_frame_selector
+from tracking import create_tracker
+from ocr_pool import OCRWorkerPool
+from metrics import create_metrics, stats_collector
+from scheduler import create_scheduler
+from fusion import create_fuser
+from channel import Channel
+from thread_budget import create_thread_budget
 import config
 
 class ARGlassesApp:
-    def __init__(self, target_lang='hi', camera_src=0):
+    def __init__(self, target_lang='hi', camera_src=0, ocr_processor=None,
+                 translation_processor=None):
+        self._start_time = time.time()
+        self.startup_phases = {}
+        self.target_lang = target_lang
+        # Created before torch is imported so OMP_NUM_THREADS takes effect
+        self.thread_budget = create_thread_budget()
         self.capture = CaptureThread(src=camera_src, 
                                    width=config.CAMERA_WIDTH, 
-                                   height=config.CAMERA_HEIGHT)
-        self.ocr_processor = OCRProcessor()
-        self.translation_processor = TranslationProcessor(target_lang)
+                                   height=config.CAMERA_HEIGHT,
+                                   thread_budget=self.thread_budget)
+        # Models are loaded in the background by _load_models once video is up;
+        # process-pool mode loads the OCR model in the workers only
+        self.ocr_processor = ocr_processor
+        self.ocr_pool = None
+        if ocr_processor is None and config.OCR_WORKERS > 0:
+            self.ocr_pool = OCRWorkerPool(self._on_ocr_result,
+                                          cores=self.thread_budget.cores('ocr'),
+                                          threads=self.thread_budget.threads('ocr'))
+        self.translation_processor = translation_processor
+        self.ocr_ready = threading.Event()
         self.display_processor = DisplayProcessor()
+        self.compositor = OverlayCompositor(self.display_processor)
+        self.sink = create_sink()
+        self.frame_selector = create_frame_selector()
+        self.tracker = create_tracker()
+        self.scheduler = create_scheduler()
+        self.fuser = create_fuser()
+        self._ocr_busy = 0  # Frames taken by the OCR thread and not finished yet
+        self._fusing = (None, 0)  # Frame of the OCR pass being fused, results already fused
         
-        # Thread-safe queues
-        self.frame_queue = queue.Queue(maxsize=config.MAX_QUEUE_SIZE)
-        self.ocr_queue = queue.Queue(maxsize=config.MAX_QUEUE_SIZE)
-        self.result_queue = queue.Queue(maxsize=config.MAX_QUEUE_SIZE)
+        # Latest-wins channels between stages: a full channel overwrites its oldest item
+        self.frame_channel = Channel('frame', capacity=1)
+        self.ocr_channel = Channel('ocr', capacity=config.MAX_QUEUE_SIZE)
+        self.result_channel = Channel('result', capacity=1)
         
         self.running = True
         self.current_results = []
         
+        self.metrics = create_metrics()
+        self._register_collectors()
+        self._phase('init', self._start_time)
+        
+    def _phase(self, name, start):
+        """Record how long a startup phase took"""
+        elapsed = time.time() - start
+        self.startup_phases[name] = round(elapsed, 3)
+        self.metrics.set('startup_seconds', elapsed, labels={'phase': name})
+        
+    def _register_collectors(self):
+        channels = (self.frame_channel, self.ocr_channel, self.result_channel)
+        self.metrics.add_collector(lambda: {
+            f'queue_depth{{queue="{channel.name}"}}': channel.pending() for channel in channels
+        })
+        for channel in channels:
+            self.metrics.add_collector(stats_collector(f'channel_{channel.name}', channel.stats))
+        self.metrics.add_collector(stats_collector('capture', self.capture.stats))
+        self.metrics.add_collector(stats_collector('frame_select', self.frame_selector.stats))
+        self.metrics.add_collector(stats_collector('tracking', self.tracker.stats))
+        self.metrics.add_collector(stats_collector('scheduler', self.scheduler.stats))
+        self.metrics.add_collector(stats_collector('fusion', self.fuser.stats))
+        self.metrics.add_collector(stats_collector('compositor', self.compositor.stats))
+        self.metrics.add_collector(stats_collector('display_sink', self.sink.stats))
+        self.metrics.add_collector(lambda: {'scheduler_scale': self.scheduler.scale})
+        if self.ocr_pool is not None:
+            self.metrics.add_collector(stats_collector('ocr_pool', self.ocr_pool.stats))
+        if self.display_processor.labels is not None:
+            self.metrics.add_collector(stats_collector('label_sprites',
+                                                       self.display_processor.labels.stats))
+        
+    def _load_models(self):
+        """Load translation and OCR in the background while the camera feed is shown"""
+        if self.translation_processor is None:
+            start = time.time()
+            if config.TRANSLATION_BACKEND == 'http':
+                from async_translate import AsyncTranslationProcessor
+                self.translation_processor = AsyncTranslationProcessor(self.target_lang)
+            else:
+                self.translation_processor = TranslationProcessor(self.target_lang)
+            self._phase('translation_load', start)
+        self.metrics.add_collector(stats_collector('translation_cache',
+                                                   self.translation_processor.cache.stats))
+        self.metrics.add_collector(stats_collector('layout',
+                                                   self.translation_processor.layout.stats))
+        self.metrics.add_collector(stats_collector('phrase_table',
+                                                   self.translation_processor.phrases.stats))
+        if hasattr(self.translation_processor, 'breaker'):
+            self.metrics.add_collector(stats_collector('translation_http',
+                                                       self.translation_processor.stats))
+        threading.Thread(target=self._translation_worker, daemon=True).start()
+        
+        if self.ocr_pool is not None:
+            start = time.time()
+            self.ocr_pool.start()
+            if self.ocr_pool.wait_ready(config.OCR_WORKER_START_TIMEOUT):
+                self._phase('ocr_workers_ready', start)
+            else:
+                print(f"OCR workers did not start ({'; '.join(self.ocr_pool.errors) or 'timeout'}),"
+                      " running OCR in a thread")
+                self.ocr_pool.stop()
+                self.ocr_pool = None
+        if self.ocr_pool is None:
+            # Torch's OpenMP pool is created here on load and warm-up, and its
+            # threads inherit this thread's CPU mask
+            self.thread_budget.apply('ocr')
+            if self.ocr_processor is None:
+                self.ocr_processor = OCRProcessor()
+                for name, seconds in self.ocr_processor.load_times.items():
+                    self.startup_phases[name] = round(seconds, 3)
+                    self.metrics.set('startup_seconds', seconds, labels={'phase': name})
+            if config.OCR_WARMUP and hasattr(self.ocr_processor, 'warm_up'):
+                start = time.time()
+                self.ocr_processor.warm_up()
+                self._phase('ocr_warmup', start)
+            if hasattr(self.ocr_processor, 'cache_stats'):
+                self.metrics.add_collector(stats_collector('ocr_cache',
+                                                           self.ocr_processor.cache_stats))
+            if hasattr(self.ocr_processor, 'detect_stats'):
+                self.metrics.add_collector(stats_collector('ocr_detect',
+                                                           self.ocr_processor.detect_stats))
+            if hasattr(self.ocr_processor, 'prioritizer'):
+                self.metrics.add_collector(stats_collector('ocr_regions',
+                                                           self.ocr_processor.prioritizer.stats))
+            threading.Thread(target=self._ocr_worker, daemon=True).start()
+        
+        self._phase('ocr_ready', self._start_time)
+        self.ocr_ready.set()
+        print(f"Startup phases (s): {self.startup_phases}")
+        
+    def _drop(self, queue_name):
+        self.metrics.inc('queue_drops_total', labels={'queue': queue_name})
+        
+    def _publish(self, channel, item):
+        if channel.put(item):
+            self._drop(channel.name)
+        
     def start(self):
         self.capture.start()
+        self.metrics.start_exporters()
         
-        # Start processing threads
-        threading.Thread(target=self._ocr_worker, daemon=True).start()
-        threading.Thread(target=self._translation_worker, daemon=True).start()
+        # Processing threads start as soon as their models are loaded
+        threading.Thread(target=self._load_models, daemon=True).start()
         
         self._main_loop()
         
+    def _on_ocr_result(self, frame, results, elapsed, stream=None):
+        self.scheduler.record_service_time(elapsed)
+        self.metrics.observe('ocr_seconds', elapsed)
+        self.metrics.tick('ocr_fps')
+        if not results:
+            return
+        self._publish(self.ocr_channel, (frame, results, True))
+            
+    def _ocr_in_flight(self):
+        """OCR work submitted but not finished, and how much can run at once"""
+        if self.ocr_pool is not None:
+            return self.ocr_pool.in_flight(), self.ocr_pool.num_workers
+        return self.frame_channel.pending() + self._ocr_busy, 1
+        
+    def _submit_ocr(self, frame):
+        scale = self.scheduler.scale
+        if self.ocr_pool is not None:
+            return self.ocr_pool.submit(frame, scale)
+        # A frame still waiting for the OCR thread is replaced by this newer one
+        self._publish(self.frame_channel, (frame, scale))
+        return True
+            
     def _ocr_worker(self):
+        self.thread_budget.apply('ocr')
+        # Sleeps in get() until a frame arrives; stop() closes the channel
         while self.running:
-            try:
-                frame = self.frame_queue.get(timeout=config.WORKER_TIMEOUT)
-                results = self.ocr_processor.process(frame)
-                if results:
-                    try:
-                        self.ocr_queue.put_nowait(results)
-                    except queue.Full:
-                        pass
-            except queue.Empty:
-                continue
+            item = self.frame_channel.get()
+            if item is None:
+                break
+            _, (frame, scale) = item
+            self._ocr_busy = 1
+            start = time.perf_counter()
+            if getattr(self.ocr_processor, 'frame_budget', None):
+                # Each chunk publishes everything read so far in this pass, so
+                # an item overwritten in the channel loses nothing
+                recognized = []
                 
+                def publish_partial(partial, frame=frame, recognized=recognized):
+                    recognized.extend(partial)
+                    self._publish(self.ocr_channel, (frame, list(recognized), False))
+                results = self.ocr_processor.process(frame, scale, on_partial=publish_partial)
+            else:
+                results = self.ocr_processor.process(frame, scale)
+            elapsed = time.perf_counter() - start
+            self._ocr_busy = 0
+            self.scheduler.record_service_time(elapsed)
+            self.metrics.observe('ocr_seconds', elapsed)
+            self.metrics.tick('ocr_fps')
+            if results:
+                self._publish(self.ocr_channel, (frame, results, True))
+                
+    def _fuse(self, frame, ocr_results, final):
+        """Fuse an OCR item holding everything read so far in its frame's pass"""
+        pass_frame, fused_count = self._fusing
+        if frame is not pass_frame:
+            if pass_frame is not None:
+                # The previous pass's final item was overwritten: close the pass
+                self.fuser.update([], True)
+            fused_count = 0
+        # Only results not yet fused count as detections in this pass
+        fused = self.fuser.update(ocr_results[fused_count:], final)
+        self._fusing = (None, 0) if final else (frame, len(ocr_results))
+        return fused
+        
     def _translation_worker(self):
+        self.thread_budget.apply('translation')
+        last_seq = 0
         while self.running:
-            try:
-                ocr_results = self.ocr_queue.get(timeout=config.WORKER_TIMEOUT)
-                translated = self.translation_processor.process(ocr_results)
-                try:
-                    self.result_queue.put_nowait(translated)
-                except queue.Full:
-                    pass
-            except queue.Empty:
+            item = self.ocr_channel.get()
+            if item is None:
+                break
+            batch = []
+            
+            # Debounce: fuse everything arriving within the window, translate the newest
+            deadline = time.time() + config.TRANSLATION_DEBOUNCE_WINDOW
+            while item is not None:
+                seq, (frame, ocr_results, final) = item
+                if seq > last_seq + 1:
+                    self.metrics.inc('channel_skipped_total', seq - last_seq - 1,
+                                     labels={'channel': 'ocr'})
+                last_seq = seq
+                batch.append(self._fuse(frame, ocr_results, final))
+                item = self.ocr_channel.get(timeout=max(deadline - time.time(), 0))
+            
+            if hasattr(self.translation_processor, 'submit'):
+                # Async client: results stream to the display as each string lands
+                self.translation_processor.submit(
+                    batch[-1], lambda translated, frame=frame:
+                    self._publish(self.result_channel, (frame, translated)))
                 continue
+            # Only the newest fused set is shown, so only it is translated
+            with self.metrics.timer('translation_seconds'):
+                translated = self.translation_processor.process(batch[-1])
+            self._publish(self.result_channel, (frame, translated))
                 
     def _main_loop(self):
-        frame_skip = 0
+        self.thread_budget.apply('display')
+        last_seq = 0
         try:
             while self.running:
-                frame = self.capture.read()
+                frame = self.capture.read_next(last_seq, timeout=config.WORKER_TIMEOUT)
                 if frame is None:
-                    time.sleep(0.01)
                     continue
+                last_seq = frame.seq
+                self.metrics.observe('capture_latency_seconds', time.time() - frame.timestamp)
                 
-                # Process every Nth frame for OCR
-                frame_skip += 1
-                if frame_skip % config.OCR_FRAME_SKIP == 0:
-                    try:
-                        self.frame_queue.put_nowait(frame)
-                    except queue.Full:
-                        pass
+                # Submit for OCR when the scheduler has capacity, once the model is loaded
+                if (self.ocr_ready.is_set()
+                        and self.scheduler.should_submit(*self._ocr_in_flight())
+                        and self.frame_selector.select(frame)):
+                    if self._submit_ocr(frame):
+                        self.frame_selector.commit()
+                        self.scheduler.submitted()
+                    else:
+                        self._drop('frame')
                 
-                # Get latest results
-                try:
-                    self.current_results = self.result_queue.get_nowait()
-                except queue.Empty:
-                    pass
+                # Get latest results and track them onto the current frame
+                item = self.result_channel.get_nowait()
+                if item is not None:
+                    _, (source_frame, results) = item
+                    self.tracker.set_results(results, source_frame)
+                self.current_results = self.tracker.update(frame)
+                if item is not None and self.current_results:
+                    # Only results that are drawn count towards glass-to-glass
+                    self.metrics.observe('glass_to_glass_seconds',
+                                         time.time() - source_frame.timestamp)
                 
                 # Display
-                display_frame = self.display_processor.overlay(frame, self.current_results)
-                cv2.imshow('AR Glasses - Press q to quit', display_frame)
-                
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                with self.metrics.timer('display_seconds'):
+                    # Luma capture modes convert to colour only here, for the shown frame
+                    display_frame = self.compositor.compose(self.capture.to_bgr(frame),
+                                                            self.current_results)
+                    if config.METRICS_HUD:
+                        display_frame = self.display_processor.draw_hud(
+                            display_frame, self.metrics.hud_lines())
+                    keep_running = self._show(display_frame)
+                self.metrics.tick('display_fps')
+                if 'first_frame' not in self.startup_phases:
+                    self._phase('first_frame', self._start_time)
+                if not keep_running:
                     break
                     
         except KeyboardInterrupt:
@@ -94,10 +308,45 @@ class ARGlassesApp:
         finally:
             self.stop()
             
+    def _show(self, display_frame):
+        """Show a composed frame; return False when the user asks to quit"""
+        return self.sink.show(display_frame)
+            
+    def close_channels(self):
+        for channel in (self.frame_channel, self.ocr_channel, self.result_channel):
+            channel.close()
+            
     def stop(self):
         self.running = False
+        self.close_channels()
         self.capture.stop()
-        cv2.destroyAllWindows()
+        self.metrics.stop()
+        if self.ocr_pool is not None:
+            self.ocr_pool.stop()
+            print(f"OCR worker pool: {self.ocr_pool.stats}")
+        print(f"Capture: {self.capture.stats}")
+        print(f"Thread budget: {self.thread_budget.report()}")
+        self.sink.close()
+        print(f"Display: {self.sink.name} {self.sink.stats}, compositor {self.compositor.stats}")
+        print(f"Frame selection: {self.frame_selector.stats}")
+        print(f"Overlay tracking: {self.tracker.stats}")
+        print(f"Result fusion: {self.fuser.stats}")
+        print("Channels: " + ", ".join(f"{channel.name} {channel.stats}" for channel in
+                                       (self.frame_channel, self.ocr_channel, self.result_channel)))
+        if hasattr(self.ocr_processor, 'cache_stats'):
+            print(f"OCR recognition cache: {self.ocr_processor.cache_stats()}")
+        if getattr(self.ocr_processor, 'frame_budget', None):
+            print(f"OCR region priority: {self.ocr_processor.prioritizer.stats}")
+        if self.translation_processor is not None:
+            print(f"Translation cache: {self.translation_processor.cache.stats}")
+            print(f"Layout assembly: {self.translation_processor.layout.stats}")
+            phrases = self.translation_processor.phrases
+            print(f"Phrase table: {phrases.stats}, {phrases.absorbed():.1%} absorbed")
+            phrases.close()
+            if hasattr(self.translation_processor, 'close'):
+                print(f"HTTP translation: {self.translation_processor.stats}")
+                self.translation_processor.close()
+            self.translation_processor.cache.close()
 
 if __name__ == '__main__':
     app = ARGlassesApp(target_lang='hi')
@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _key(name, labels):
+    if not labels:
+        return name
+    inner = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f'{name}{{{inner}}}'
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = 0.0  # Exponential moving average for the HUD
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.recent = value if self.count == 1 else 0.9 * self.recent + 0.1 * value
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class NullMetrics:
+    """Metrics sink used when instrumentation is disabled; every call is a no-op"""
+    enabled = False
+
+    def inc(self, name, value=1, labels=None):
+        pass
+
+    def set(self, name, value, labels=None):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+    def timer(self, name):
+        return _NULL_TIMER
+
+    def add_collector(self, collector):
+        pass
+
+    def tick(self, name):
+        pass
+
+    def hud_lines(self):
+        return []
+
+    def start_exporters(self, port=None, textfile=None, interval=None):
+        pass
+
+    def stop(self):
+        pass
+
+class Metrics:
+    """Counters, gauges and latency histograms shared by all pipeline stages
+
+    Collectors are callables returning {name: value} that are polled at
+    export time, so stages that already keep a stats dict (caches, frame
+    selector, capture) do not pay anything per frame.
+    """
+    enabled = True
+
+    def __init__(self, prefix=None, buckets=DEFAULT_BUCKETS):
+        self.prefix = config.METRICS_PREFIX if prefix is None else prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._rates = {}
+        self._collectors = []
+        self._server = None
+        self._writer = None
+        self._textfile = None
+        self._stop = threading.Event()
+
+    def inc(self, name, value=1, labels=None):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def tick(self, name):
+        """Count an event and keep its smoothed rate per second as a gauge"""
+        now = time.time()
+        with self._lock:
+            last, rate = self._rates.get(name, (None, 0.0))
+            if last is not None and now > last:
+                instant = 1.0 / (now - last)
+                rate = instant if rate == 0 else 0.9 * rate + 0.1 * instant
+            self._rates[name] = (now, rate)
+            self._gauges[name] = round(rate, 2)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def _collect(self):
+        collected = {}
+        for collector in self._collectors:
+            try:
+                collected.update(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        return collected
+
+    def render_prometheus(self):
+        """Current metrics in Prometheus text exposition format"""
+        collected = self._collect()
+        lines = []
+        with self._lock:
+            for key, value in sorted(self._counters.items()):
+                lines.append(f'{self.prefix}{key} {value}')
+            for key, value in sorted({**self._gauges, **collected}.items()):
+                lines.append(f'{self.prefix}{key} {value}')
+            for name, histogram in sorted(self._histograms.items()):
+                full = f'{self.prefix}{name}'
+                lines.append(f'# TYPE {full} histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{full}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f'{full}_sum {histogram.sum:.6f}')
+                lines.append(f'{full}_count {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def hud_lines(self):
+        """Short text lines for the on-frame performance HUD"""
+        with self._lock:
+            lines = [f"FPS {self._gauges.get('display_fps', 0):.1f}  "
+                     f"OCR/s {self._gauges.get('ocr_fps', 0):.1f}"]
+            stages = [(label, self._histograms.get(name)) for label, name in
+                      (('ocr', 'ocr_seconds'), ('tr', 'translation_seconds'),
+                       ('g2g', 'glass_to_glass_seconds'))]
+            lines.append('  '.join(f'{label} {h.recent * 1000:.0f}ms'
+                                   for label, h in stages if h is not None))
+            drops = sum(v for k, v in self._counters.items() if k.startswith('queue_drops_total'))
+        lines.append(f'drops {drops}')
+        return [line for line in lines if line]
+
+    def write_textfile(self, path):
+        """Atomically write metrics for the node_exporter textfile collector"""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def start_exporters(self, port=None, textfile=None, interval=None):
+        port = config.METRICS_HTTP_PORT if port is None else port
+        textfile = config.METRICS_TEXTFILE if textfile is None else textfile
+        interval = config.METRICS_EXPORT_INTERVAL if interval is None else interval
+
+        if port:
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = metrics.render_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        if textfile:
+            self._textfile = textfile
+
+            def write_loop():
+                while not self._stop.wait(interval):
+                    self.write_textfile(textfile)
+            self._writer = threading.Thread(target=write_loop, daemon=True)
+            self._writer.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._textfile:
+            self.write_textfile(self._textfile)
+
+def stats_collector(prefix, source):
+    """Collector exposing the numeric entries of a stats dict (or a callable returning one)"""
+    def collect():
+        stats = source() if callable(source) else source
+        return {f'{prefix}_{k}': v for k, v in stats.items()
+                if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    return collect
+
+def create_metrics():
+    if config.METRICS_ENABLED:
+        return Metrics()
+    return NullMetrics()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Local LibreTranslate-style translation server with injected latency and errors
+
+Answers POST /translate with {"translatedText": "[<target>] <q>"} after a
+configurable delay. A fraction of requests can fail with HTTP 503 or hang
+far past any client deadline, to exercise timeouts and the circuit breaker
+of the async translation client without network access.
+
+Usage:
+    python3 mock_translate_server.py --port 5000 --latency 0.2 --error-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so client connection pooling is exercised
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.stats['requests'] += 1
+            roll = server.random.random()
+
+        if roll < server.error_rate:
+            with server.lock:
+                server.stats['errors'] += 1
+            self._reply(503, {'error': 'injected failure'})
+            return
+        if roll < server.error_rate + server.hang_rate:
+            with server.lock:
+                server.stats['hangs'] += 1
+            time.sleep(server.hang_time)
+
+        time.sleep(server.latency + server.random.uniform(0, server.jitter))
+        try:
+            request = json.loads(body)
+            self._reply(200, {'translatedText': f"[{request['target']}] {request['q']}"})
+        except (ValueError, KeyError):
+            self._reply(400, {'error': 'expected JSON with q and target'})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_mock_server(host='127.0.0.1', port=0, latency=0.1, jitter=0.0, error_rate=0.0,
+                      hang_rate=0.0, hang_time=30.0, seed=None):
+    """Serve in a background thread; the URL is server.url, stop with server.shutdown()"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.hang_rate = hang_rate
+    server.hang_time = hang_time
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.stats = {'requests': 0, 'errors': 0, 'hangs': 0}
+    server.url = f'http://{host}:{server.server_address[1]}/translate'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds per request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction answered 503')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='fraction that hang')
+    parser.add_argument('--hang-time', type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.host, args.port, args.latency, args.jitter,
+                               args.error_rate, args.hang_rate, args.hang_time)
+    print(f"Mock translation server at {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(server.stats)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
-import easyocr
 import cv2
 import numpy as np
+import time
+import config
+from ocr_backends import create_backend
+from ocr_cache import RecognitionCache
+from ocr_priority import RegionPrioritizer
 
 class OCRProcessor:
-    def __init__(self):
-        # Initialize EasyOCR reader (English by default)
-        self.reader = easyocr.Reader(['en'], gpu=False)  # Set gpu=True if available
+    def __init__(self, backend=None):
+        # Detector and recognizer engine (EasyOCR by default, see OCR_BACKEND)
+        self.backend = create_backend() if backend is None else backend
+        self.load_times = dict(self.backend.load_times)
         self.min_confidence = 0.5  # EasyOCR uses 0-1 scale
+        self.cache = RecognitionCache() if config.OCR_CACHE_ENABLED else None
+        
+        # Multi-resolution mode: detect on a downscaled copy, recognize at full resolution
+        self.detect_scale = config.OCR_DETECT_SCALE
+        self.detect_grayscale = config.OCR_DETECT_GRAYSCALE
+        self.detect_margin = config.OCR_DETECT_MARGIN
+        self.small_text_height = config.OCR_SMALL_TEXT_HEIGHT
+        self.detect_stats = {'detections': 0, 'small_text_fallbacks': 0}
+        
+        # Time-budgeted mode: recognize regions by priority until the deadline
+        self.frame_budget = config.OCR_FRAME_BUDGET
+        self.budget_chunk = config.OCR_BUDGET_CHUNK
+        self.prioritizer = RegionPrioritizer()
         
     def _preprocess(self, frame):
         """Light preprocessing for EasyOCR"""
@@ -16,42 +34,175 @@ class OCRProcessor:
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return frame
         
-    def process(self, frame):
-        """Process frame with EasyOCR"""
-        try:
-            # Preprocess frame
-            processed = self._preprocess(frame)
+    def _grayscale(self, frame):
+        if len(frame.shape) == 3:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
+
+    def _detect_full(self, frame):
+        return self.backend.detect(self._preprocess(frame))
+
+    def _detect(self, frame):
+        """Run the text detector only, returning boxes in frame coordinates"""
+        self.detect_stats['detections'] += 1
+        scale = self.detect_scale
+        if scale >= 1.0:
+            return self._detect_full(frame)
+
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        small = self._grayscale(small) if self.detect_grayscale else self._preprocess(small)
+        horizontal_list, free_list = self.backend.detect(small, min_size=max(int(20 * scale), 5))
+
+        # Text too small to trust at this scale: detect again at full resolution
+        if self.small_text_height and any(y_max - y_min < self.small_text_height
+                                          for (_, _, y_min, y_max) in horizontal_list):
+            self.detect_stats['small_text_fallbacks'] += 1
+            return self._detect_full(frame)
+
+        margin = self.detect_margin
+        horizontal_list = [[int(x_min / scale) - margin, int(x_max / scale) + margin,
+                            int(y_min / scale) - margin, int(y_max / scale) + margin]
+                           for (x_min, x_max, y_min, y_max) in horizontal_list]
+        free_list = [[[x / scale, y / scale] for (x, y) in box] for box in free_list]
+        return horizontal_list, free_list
+
+    def _clip_box(self, box, width, height):
+        x_min, x_max, y_min, y_max = box
+        return (max(0, int(x_min)), min(int(x_max), width),
+                max(0, int(y_min)), min(int(y_max), height))
+
+    def _recognize(self, gray, horizontal_list, free_list):
+        """Recognize detected boxes, serving repeated crops from the cache"""
+        if self.cache is None:
+            return self.backend.recognize(gray, horizontal_list, free_list)
+
+        height, width = gray.shape[:2]
+        results = []
+        misses = {}
+        for box in horizontal_list:
+            x_min, x_max, y_min, y_max = self._clip_box(box, width, height)
+            key = self.cache.key(gray[y_min:y_max, x_min:x_max])
+            if key is None:
+                continue
+            cached = self.cache.get(key)
+            points = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+            if cached is not None:
+                text, confidence = cached
+                results.append((points, text, confidence))
+            else:
+                misses[(x_min, y_min, x_max, y_max)] = key
+
+        if misses or free_list:
+            miss_boxes = [[x_min, x_max, y_min, y_max]
+                          for (x_min, y_min, x_max, y_max) in misses]
+            start = time.time()
+            recognized = self.backend.recognize(gray, miss_boxes, free_list)
+            self.cache.record_recognize_time(time.time() - start,
+                                             len(miss_boxes) + len(free_list))
+            for (points, text, confidence) in recognized:
+                xs = [int(p[0]) for p in points]
+                ys = [int(p[1]) for p in points]
+                key = misses.get((min(xs), min(ys), max(xs), max(ys)))
+                if key is not None:
+                    self.cache.put(key, (text, confidence))
+                results.append((points, text, confidence))
+
+        return results
+
+    def _convert(self, results, frame_height, scale):
+        """Recognizer output as result dicts in full-frame coordinates"""
+        min_w, min_h = config.OCR_MIN_TEXT_SIZE
+        max_h = frame_height / scale * config.OCR_MAX_TEXT_HEIGHT
+        ocr_results = []
+        for (bbox, text, confidence) in results:
+            if confidence < self.min_confidence:
+                continue
+                
+            if len(text.strip()) < 2:  # Skip single characters
+                continue
             
-            # Run EasyOCR
-            results = self.reader.readtext(processed)
+            # Convert bbox format
+            x_coords = [point[0] / scale for point in bbox]
+            y_coords = [point[1] / scale for point in bbox]
+            x, y = int(min(x_coords)), int(min(y_coords))
+            w, h = int(max(x_coords) - x), int(max(y_coords) - y)
             
-            # Convert to our format
-            ocr_results = []
-            for (bbox, text, confidence) in results:
-                if confidence < self.min_confidence:
-                    continue
-                    
-                if len(text.strip()) < 2:  # Skip single characters
-                    continue
-                
-                # Convert bbox format
-                x_coords = [point[0] for point in bbox]
-                y_coords = [point[1] for point in bbox]
-                x, y = int(min(x_coords)), int(min(y_coords))
-                w, h = int(max(x_coords) - x), int(max(y_coords) - y)
-                
-                # Filter reasonable sizes
-                if w < 20 or h < 10 or w > 500 or h > 100:
-                    continue
-                
-                ocr_results.append({
-                    'text': text.strip(),
-                    'bbox': (x, y, w, h),
-                    'confidence': int(confidence * 100)  # Convert to percentage
-                })
+            # Filter reasonable sizes; long lines and close-up signs are kept
+            if w < min_w or h < min_h or h > max_h:
+                continue
+            
+            ocr_results.append({
+                'text': text.strip(),
+                'bbox': (x, y, w, h),
+                'confidence': int(confidence * 100)  # Convert to percentage
+            })
+        return ocr_results
+        
+    def _recognize_budgeted(self, gray, horizontal_list, free_list, scale, deadline, on_partial):
+        """Recognize regions in priority order until the deadline, streaming each chunk"""
+        regions = self.prioritizer.rank(horizontal_list, free_list, gray.shape,
+                                        getattr(self.backend, 'last_scores', None))
+        ocr_results = []
+        done = 0
+        while done < len(regions):
+            # The first chunk always runs so every cycle makes progress
+            if done and time.perf_counter() >= deadline:
+                break
+            chunk = regions[done:done + self.budget_chunk]
+            done += len(chunk)
+            results = self._recognize(gray, [box for kind, box in chunk if kind == 'horizontal'],
+                                      [box for kind, box in chunk if kind == 'free'])
+            converted = self._convert(results, gray.shape[0], scale)
+            ocr_results.extend(converted)
+            if converted and on_partial is not None:
+                on_partial(converted)
+        self.prioritizer.finish(done)
+        return ocr_results
+        
+    def process(self, frame, scale=1.0, on_partial=None):
+        """Process frame with the OCR backend, optionally at a reduced scale
+
+        With OCR_FRAME_BUDGET set, regions are recognized by priority until
+        the budget (counted from this call) runs out; on_partial receives
+        each batch of new results as it is recognized.
+        """
+        start = time.perf_counter()
+        try:
+            if scale < 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
                 
-            return ocr_results
+            # Detect text boxes, then recognize each crop at native resolution
+            horizontal_list, free_list = self._detect(frame)
+            if not horizontal_list and not free_list:
+                return []
+            gray = self._grayscale(frame)
+            if self.frame_budget:
+                return self._recognize_budgeted(gray, horizontal_list, free_list, scale,
+                                                start + self.frame_budget, on_partial)
+            results = self._recognize(gray, horizontal_list, free_list)
+            return self._convert(results, frame.shape[0], scale)
             
         except Exception as e:
-            print(f"EasyOCR Error: {e}")
+            print(f"OCR Error ({self.backend.name}): {e}")
             return []
+
+    def warm_up(self):
+        """Run one inference on a synthetic image so the first real frame is not slow"""
+        img = np.full((config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), 255, dtype=np.uint8)
+        cv2.putText(img, 'WARM UP 123', (40, config.CAMERA_HEIGHT // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+        start = time.time()
+        self.process(img)
+        if self.cache is not None:
+            self.cache.clear()
+            self.cache.stats.update(hits=0, misses=0, evictions=0, time_saved=0.0)
+        return time.time() - start
+        
+    def cache_stats(self):
+        """Recognition cache hit rate and estimated recognizer time saved"""
+        if self.cache is None:
+            return {}
+        stats = dict(self.cache.stats)
+        stats['hit_rate'] = round(self.cache.hit_rate, 3)
+        stats['time_saved'] = round(stats['time_saved'], 3)
+        return stats
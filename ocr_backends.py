@@ -0,0 +1,162 @@
+import json
+import os
+import time
+import cv2
+import numpy as np
+import config
+
+class EasyOCRBackend:
+    """EasyOCR detector and recognizer running in PyTorch"""
+    name = 'easyocr'
+
+    def __init__(self, languages=('en',), gpu=False):
+        # easyocr pulls in torch; import it here so the app can show video first
+        start = time.time()
+        import easyocr
+        self.load_times = {'ocr_import': time.time() - start}
+
+        start = time.time()
+        self.reader = easyocr.Reader(list(languages), gpu=gpu)  # Set gpu=True if available
+        self.load_times['ocr_model'] = time.time() - start
+        self.last_scores = None  # easyocr.Reader.detect does not expose box confidence
+
+    def detect(self, img, min_size=20):
+        """Text boxes for one image as (horizontal_list, free_list)"""
+        horizontal_list, free_list = self.reader.detect(img, min_size=min_size)
+        return horizontal_list[0], free_list[0]
+
+    def recognize(self, gray, horizontal_list, free_list):
+        """List of (points, text, confidence) for the given boxes"""
+        return self.reader.recognize(gray, horizontal_list=horizontal_list, free_list=free_list)
+
+class ONNXBackend:
+    """EasyOCR's CRAFT detector and CRNN recognizer exported to ONNX
+
+    Pre- and post-processing reuse EasyOCR's own numpy helpers so boxes and
+    text match the PyTorch backend; only the two networks run under ONNX
+    Runtime's CPU provider, optionally with int8 weights. Models come from
+    export_onnx.py.
+    """
+    name = 'onnx'
+
+    def __init__(self, model_dir=None, int8=None, threads=None):
+        model_dir = config.OCR_ONNX_DIR if model_dir is None else model_dir
+        int8 = config.OCR_ONNX_INT8 if int8 is None else int8
+        threads = config.OCR_ONNX_THREADS if threads is None else threads
+        self.last_scores = None  # Detector confidence per box from the last detect()
+
+        start = time.time()
+        import onnxruntime as ort
+        from easyocr.craft_utils import getDetBoxes, adjustResultCoordinates
+        from easyocr.imgproc import resize_aspect_ratio, normalizeMeanVariance
+        from easyocr.utils import group_text_box, get_image_list
+        self._getDetBoxes = getDetBoxes
+        self._adjust = adjustResultCoordinates
+        self._resize = resize_aspect_ratio
+        self._normalize = normalizeMeanVariance
+        self._group = group_text_box
+        self._image_list = get_image_list
+        self.load_times = {'ocr_import': time.time() - start}
+
+        start = time.time()
+        with open(os.path.join(model_dir, 'recognizer.json')) as f:
+            meta = json.load(f)
+        self.characters = ['[blank]'] + list(meta['characters'])
+        self.image_height = meta.get('image_height', 64)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        suffix = '.int8.onnx' if int8 else '.onnx'
+        providers = ['CPUExecutionProvider']
+        self.detector = ort.InferenceSession(os.path.join(model_dir, 'detector' + suffix),
+                                             options, providers=providers)
+        self.recognizer = ort.InferenceSession(os.path.join(model_dir, 'recognizer' + suffix),
+                                               options, providers=providers)
+        self._detector_input = self.detector.get_inputs()[0].name
+        self._recognizer_input = self.recognizer.get_inputs()[0].name
+        self.load_times['ocr_model'] = time.time() - start
+
+    def detect(self, img, min_size=20, canvas_size=2560, text_threshold=0.7,
+               link_threshold=0.4, low_text=0.4):
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        resized, target_ratio, _ = self._resize(img, canvas_size, interpolation=cv2.INTER_LINEAR,
+                                                mag_ratio=1.0)
+        ratio = 1 / target_ratio
+        x = self._normalize(resized).transpose(2, 0, 1)[None].astype(np.float32)
+        y = self.detector.run(None, {self._detector_input: x})[0]
+
+        boxes, polys, _ = self._getDetBoxes(y[0, :, :, 0], y[0, :, :, 1], text_threshold,
+                                            link_threshold, low_text, False)
+        boxes = self._adjust(boxes, ratio, ratio)
+        polys = self._adjust(polys, ratio, ratio)
+        polys = [boxes[k] if poly is None else poly for k, poly in enumerate(polys)]
+        result = [np.array(poly).astype(np.int32).reshape(-1) for poly in polys]
+
+        horizontal_list, free_list = self._group(result, 0.1, 0.5, 0.5, 0.5, 0.1, True)
+        horizontal_list = [b for b in horizontal_list if max(b[1] - b[0], b[3] - b[2]) > min_size]
+        free_list = [b for b in free_list
+                     if max(np.ptp([p[0] for p in b]), np.ptp([p[1] for p in b])) > min_size]
+        self.last_scores = self._box_scores(y[0, :, :, 0], target_ratio / 2,
+                                            horizontal_list, free_list)
+        return horizontal_list, free_list
+
+    def _box_scores(self, textmap, heat_ratio, horizontal_list, free_list):
+        """Peak text score inside each box, in the order horizontal then free"""
+        height, width = textmap.shape
+        bounds = list(horizontal_list) + [[min(p[0] for p in b), max(p[0] for p in b),
+                                           min(p[1] for p in b), max(p[1] for p in b)]
+                                          for b in free_list]
+        scores = []
+        for x_min, x_max, y_min, y_max in bounds:
+            x0, x1 = max(int(x_min * heat_ratio), 0), min(int(x_max * heat_ratio) + 1, width)
+            y0, y1 = max(int(y_min * heat_ratio), 0), min(int(y_max * heat_ratio) + 1, height)
+            region = textmap[y0:y1, x0:x1]
+            scores.append(float(region.max()) if region.size else 0.0)
+        return scores
+
+    def _decode(self, probs):
+        """Greedy CTC decode of (T, C) probabilities into text and confidence"""
+        indices = probs.argmax(axis=1)
+        values = probs.max(axis=1)
+        chars = []
+        previous = 0
+        for index in indices:
+            if index != previous and index != 0:
+                chars.append(self.characters[index])
+            previous = index
+        kept = values[indices != 0]
+        confidence = float(kept.prod() ** (2.0 / np.sqrt(len(kept)))) if len(kept) else 0.0
+        return ''.join(chars), confidence
+
+    def recognize(self, gray, horizontal_list, free_list):
+        image_list, _ = self._image_list(horizontal_list, free_list, gray,
+                                         model_height=self.image_height)
+        if not image_list:
+            return []
+
+        # Batch all crops, padding to the widest by repeating the last column like EasyOCR
+        width = max(crop.shape[1] for _, crop in image_list)
+        batch = np.empty((len(image_list), 1, self.image_height, width), dtype=np.float32)
+        for i, (_, crop) in enumerate(image_list):
+            normalized = crop.astype(np.float32) / 127.5 - 1.0
+            batch[i, 0, :, :crop.shape[1]] = normalized
+            batch[i, 0, :, crop.shape[1]:] = normalized[:, -1:]
+
+        logits = self.recognizer.run(None, {self._recognizer_input: batch})[0]
+        logits = logits - logits.max(axis=2, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=2, keepdims=True)
+
+        results = []
+        for (box, _), crop_probs in zip(image_list, probs):
+            text, confidence = self._decode(crop_probs)
+            results.append((box, text, confidence))
+        return results
+
+def create_backend(name=None):
+    name = config.OCR_BACKEND if name is None else name
+    if name == 'onnx':
+        return ONNXBackend()
+    return EasyOCRBackend()
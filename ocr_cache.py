@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+import time
+from collections import OrderedDict
+import config
+
+class RecognitionCache:
+    """Bounded LRU of recognized text keyed by a perceptual hash of the crop
+
+    Crops are normalized to a small fixed-size grayscale patch and hashed
+    with a difference hash, so the same word seen again under slightly
+    different lighting or position maps to the same key.
+    """
+    def __init__(self, max_size=None, max_age=None, hash_size=None):
+        self.max_size = config.OCR_CACHE_SIZE if max_size is None else max_size
+        self.max_age = config.OCR_CACHE_MAX_AGE if max_age is None else max_age
+        self.hash_size = config.OCR_CACHE_HASH_SIZE if hash_size is None else hash_size
+        self._entries = OrderedDict()
+        self._recognize_time = 0.0  # Moving average seconds per crop
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'time_saved': 0.0}
+
+    def key(self, gray_crop):
+        """Perceptual hash of a grayscale text crop"""
+        h, w = gray_crop.shape[:2]
+        if h == 0 or w == 0:
+            return None
+        hash_w, hash_h = self.hash_size
+        small = cv2.resize(gray_crop, (hash_w + 1, hash_h), interpolation=cv2.INTER_AREA)
+        bits = small[:, 1:] > small[:, :-1]
+        # Aspect ratio bucket keeps short and long words with similar texture apart
+        aspect = min(int(round(w / h * 2)), 255)
+        return bytes([aspect]) + np.packbits(bits).tobytes()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, timestamp = entry
+            if time.time() - timestamp <= self.max_age:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['time_saved'] += self._recognize_time
+                return value
+            del self._entries[key]
+            self.stats['evictions'] += 1
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def record_recognize_time(self, seconds, crops):
+        """Update the per-crop recognizer cost used to estimate time saved"""
+        if crops <= 0:
+            return
+        per_crop = seconds / crops
+        if self._recognize_time == 0:
+            self._recognize_time = per_crop
+        else:
+            self._recognize_time = 0.9 * self._recognize_time + 0.1 * per_crop
+
+    @property
+    def hit_rate(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def clear(self):
+        self._entries.clear()
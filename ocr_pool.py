@@ -0,0 +1,192 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+import config
+
+def _worker_main(shm_name, ring_shape, task_queue, result_queue, threads, cores=None):
+    """OCR worker process: recognize frames written into the shared ring"""
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from ocr import OCRProcessor
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        ocr = OCRProcessor()
+        if config.OCR_WARMUP:
+            ocr.warm_up()
+    except Exception as e:
+        # Let the parent fall back instead of waiting for a ready message
+        result_queue.put(('failed', os.getpid(), repr(e), 0.0))
+        del ring
+        shm.close()
+        return
+    result_queue.put(('ready', os.getpid(), None, 0.0))
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, slot, height, width, scale = task
+            start = time.perf_counter()
+            results = ocr.process(ring[slot, :height, :width], scale)
+            result_queue.put((seq, slot, results, time.perf_counter() - start))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del ring
+        shm.close()
+
+class OCRWorkerPool:
+    """Run OCRProcessor instances in worker processes
+
+    Frames are copied once into a ring of preallocated shared-memory
+    buffers; only the slot index crosses the process boundary. Results
+    carry the frame sequence number and are delivered in order: a result
+    older than one already delivered for the same stream is discarded so
+    the display never goes backwards in time.
+    """
+    def __init__(self, on_result, num_workers=None, slots=None,
+                 width=None, height=None, cores=None, threads=None):
+        self.on_result = on_result
+        self.num_workers = config.OCR_WORKERS if num_workers is None else num_workers
+        slots = config.OCR_RING_SLOTS if slots is None else slots
+        width = config.CAMERA_WIDTH if width is None else width
+        height = config.CAMERA_HEIGHT if height is None else height
+
+        self.ring_shape = (max(slots, self.num_workers + 1), height, width, 3)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.ring_shape)))
+        self._ring = np.ndarray(self.ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        ctx = mp.get_context('spawn')
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._free_slots = queue.Queue()
+        for slot in range(self.ring_shape[0]):
+            self._free_slots.put(slot)
+
+        # The OCR thread budget (or every core) is split between the workers
+        threads = os.cpu_count() if threads is None else threads
+        threads = max(1, (threads or 1) // self.num_workers)
+        self._workers = [ctx.Process(target=_worker_main, daemon=True,
+                                     args=(self._shm.name, self.ring_shape,
+                                           self._tasks, self._results, threads, cores))
+                         for _ in range(self.num_workers)]
+
+        self._frames = {}
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._last_delivered = {}  # Per stream, so several sources can share the pool
+        self._collector = None
+        self.running = False
+        self.ready = threading.Event()  # Set once the first worker has loaded its model
+        self.errors = []  # Model load errors reported by workers
+        self.stats = {'workers_ready': 0, 'submitted': 0, 'dropped_busy': 0,
+                      'dropped_stale': 0, 'delivered': 0}
+
+    def start(self):
+        self.running = True
+        for worker in self._workers:
+            worker.start()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def wait_ready(self, timeout=None):
+        """Wait for a worker to load its model; False on timeout or if every worker failed"""
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.ready.wait(config.WORKER_TIMEOUT):
+            if len(self.errors) >= self.num_workers:
+                return False
+            if not any(worker.is_alive() for worker in self._workers):
+                return self.ready.is_set()
+            if deadline is not None and time.time() >= deadline:
+                return False
+        return True
+
+    def in_flight(self):
+        """Frames submitted whose results have not come back yet"""
+        return self.ring_shape[0] - self._free_slots.qsize()
+
+    def submit(self, frame, scale=1.0, stream=None):
+        """Copy frame into a free ring slot and queue it; False if all slots are busy"""
+        height, width = frame.shape[:2]
+        if height > self.ring_shape[1] or width > self.ring_shape[2]:
+            return False
+        try:
+            slot = self._free_slots.get_nowait()
+        except queue.Empty:
+            self.stats['dropped_busy'] += 1
+            return False
+
+        np.copyto(self._ring[slot, :height, :width], frame[:, :, :3] if frame.ndim == 3
+                  else frame[:, :, None])
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._frames[seq] = (frame, stream)
+        self._tasks.put((seq, slot, height, width, scale))
+        self.stats['submitted'] += 1
+        return True
+
+    def _collect(self):
+        while self.running:
+            try:
+                seq, slot, results, elapsed = self._results.get(timeout=config.WORKER_TIMEOUT)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if seq == 'ready':
+                self.stats['workers_ready'] += 1
+                self.ready.set()
+                continue
+            if seq == 'failed':
+                self.errors.append(results)
+                continue
+            self._free_slots.put(slot)
+
+            with self._lock:
+                frame, stream = self._frames.pop(seq, (None, None))
+                if seq < self._last_delivered.get(stream, -1):
+                    self.stats['dropped_stale'] += 1
+                    continue
+                self._last_delivered[stream] = seq
+
+            self.stats['delivered'] += 1
+            if frame is not None:
+                self.on_result(frame, results, elapsed, stream)
+
+    def stop(self, timeout=2.0):
+        """Stop the workers and release the ring, even if shutdown is interrupted"""
+        if self._shm is None:
+            return
+        try:
+            if self.running:
+                self.running = False
+                for _ in self._workers:
+                    self._tasks.put(None)
+                for worker in self._workers:
+                    worker.join(timeout)
+                self._collector.join(timeout)
+        finally:
+            for worker in self._workers:
+                if worker.is_alive():
+                    worker.terminate()
+            # Workers may have died without reading their stop messages
+            self._tasks.cancel_join_thread()
+            self._tasks.close()
+            self._results.close()
+            del self._ring
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
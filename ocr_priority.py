@@ -0,0 +1,81 @@
+import numpy as np
+import config
+from fusion import iou
+
+def _box_xywh(kind, box):
+    """(x, y, w, h) of a horizontal [x_min, x_max, y_min, y_max] or free 4-point box"""
+    if kind == 'horizontal':
+        x_min, x_max, y_min, y_max = box
+    else:
+        xs = [p[0] for p in box]
+        ys = [p[1] for p in box]
+        x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+    return x_min, y_min, x_max - x_min, y_max - y_min
+
+class RegionPrioritizer:
+    """Order detected text regions for recognition under a time budget
+
+    Each region scores a weighted sum of closeness to the view centre,
+    size, novelty (how little it overlaps regions recognized last cycle)
+    and detector confidence when the backend reports one. Regions left
+    over when the deadline hit get a bonus next cycle if they are detected
+    again, so nothing is starved by busier parts of the view. Boxes are
+    compared in frame-relative coordinates so a changed OCR scale does
+    not break matching.
+    """
+    def __init__(self, weights=None, carry_bonus=None, iou_threshold=0.3):
+        self.weights = dict(config.OCR_PRIORITY_WEIGHTS if weights is None else weights)
+        self.carry_bonus = config.OCR_PRIORITY_CARRY if carry_bonus is None else carry_bonus
+        self.iou_threshold = iou_threshold
+        self._recognized = []  # Relative boxes recognized last cycle
+        self._carried = []  # Relative boxes left over when the deadline hit
+        self._pending = []  # Relative boxes of the current cycle in ranked order
+        self.stats = {'regions': 0, 'recognized': 0, 'carried_over': 0, 'deadline_hits': 0}
+
+    def _overlaps(self, box, boxes):
+        return max((iou(box, other) for other in boxes), default=0.0)
+
+    def rank(self, horizontal_list, free_list, frame_shape, scores=None):
+        """List of (kind, box) in recognition order"""
+        height, width = frame_shape[:2]
+        regions = ([('horizontal', box) for box in horizontal_list] +
+                   [('free', box) for box in free_list])
+        self.stats['regions'] += len(regions)
+        if not regions:
+            return []
+
+        relative = []
+        for kind, box in regions:
+            x, y, w, h = _box_xywh(kind, box)
+            relative.append((x / width, y / height, w / width, h / height))
+        boxes = np.array(relative, dtype=np.float64)
+
+        centres = boxes[:, :2] + boxes[:, 2:] / 2
+        centre = 1.0 - np.minimum(np.hypot(centres[:, 0] - 0.5, centres[:, 1] - 0.5) /
+                                  np.hypot(0.5, 0.5), 1.0)
+        size = np.minimum(np.sqrt(boxes[:, 2] * boxes[:, 3]) * 2, 1.0)
+        novelty = np.array([1.0 - self._overlaps(box, self._recognized) for box in relative])
+        carried = np.array([self._overlaps(box, self._carried) >= self.iou_threshold
+                            for box in relative], dtype=np.float64)
+
+        terms = {'centre': centre, 'size': size, 'novelty': novelty}
+        if scores is not None and len(scores) == len(regions):
+            terms['confidence'] = np.asarray(scores, dtype=np.float64)
+        used = {name: self.weights.get(name, 0.0) for name in terms}
+        total = sum(used.values()) or 1.0
+        priority = sum(used[name] * values for name, values in terms.items()) / total
+        priority = priority + self.carry_bonus * carried
+
+        order = np.argsort(-priority, kind='stable')
+        self._pending = [relative[i] for i in order]
+        return [regions[i] for i in order]
+
+    def finish(self, recognized_count):
+        """Record that the first recognized_count ranked regions were read this cycle"""
+        self._recognized = self._pending[:recognized_count]
+        self._carried = self._pending[recognized_count:]
+        self.stats['recognized'] += len(self._recognized)
+        self.stats['carried_over'] += len(self._carried)
+        if self._carried:
+            self.stats['deadline_hits'] += 1
+        self._pending = []
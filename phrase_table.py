@@ -0,0 +1,177 @@
+import mmap
+import os
+import re
+import struct
+import unicodedata
+import config
+
+MAGIC = b'ARPT1\0'
+HEADER = struct.Struct('<6sI')  # magic, entry count
+OFFSET = struct.Struct('<I')
+
+_NUMERIC = re.compile(r'^[\d\s.,:;/%+\-()#°$€£₹]+$')
+_URL = re.compile(r'^((https?://|www\.)\S+'
+                  r'|[\w.+-]+@[\w-]+\.[\w.-]+'  # e-mail addresses
+                  r'|[\w-]+(\.[\w-]+)*\.(com|org|net|in|io|gov|edu)(/\S*)?)$',
+                  re.IGNORECASE)
+
+# Unicode blocks of non-Latin target scripts; text already written in one needs no translation
+SCRIPTS = {
+    'hi': (0x0900, 0x097F), 'mr': (0x0900, 0x097F), 'ne': (0x0900, 0x097F),
+    'bn': (0x0980, 0x09FF), 'pa': (0x0A00, 0x0A7F), 'gu': (0x0A80, 0x0AFF),
+    'ta': (0x0B80, 0x0BFF), 'te': (0x0C00, 0x0C7F), 'kn': (0x0C80, 0x0CFF),
+    'ml': (0x0D00, 0x0D7F), 'ar': (0x0600, 0x06FF), 'ur': (0x0600, 0x06FF),
+    'ru': (0x0400, 0x04FF), 'el': (0x0370, 0x03FF), 'he': (0x0590, 0x05FF),
+    'th': (0x0E00, 0x0E7F), 'ko': (0xAC00, 0xD7AF), 'ja': (0x3040, 0x30FF),
+    'zh-cn': (0x4E00, 0x9FFF), 'zh-tw': (0x4E00, 0x9FFF),
+}
+
+def normalize(text):
+    """Lookup key: NFKC, case-folded, single spaces, no surrounding punctuation"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ' '.join(text.split())
+    return text.strip('.,:;!?-–—"\'()[]*')
+
+def in_script(text, lang, share=0.8):
+    """True if most letters of text are already in the target language's script"""
+    block = SCRIPTS.get(lang)
+    if block is None:
+        return False
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return False
+    inside = sum(1 for c in letters if block[0] <= ord(c) <= block[1])
+    return inside >= share * len(letters)
+
+def is_passthrough(text, lang):
+    """Text that is shown as-is: numbers, URLs/e-mail addresses, or already in the target script"""
+    stripped = text.strip()
+    return bool(_NUMERIC.match(stripped) or _URL.match(stripped) or in_script(stripped, lang))
+
+def _key(lang, text):
+    return f'{lang}\t{normalize(text)}'.encode('utf-8')
+
+def build(entries, path):
+    """Write (lang, source, translation) entries as a sorted, memory-mappable table
+
+    Layout: header, key offsets (count + 1), value offsets (count + 1), key
+    bytes, value bytes. Keys are "lang<TAB>normalized source" in UTF-8 byte
+    order, so lookups are a binary search straight on the mapped file.
+    Returns the number of distinct entries written (later duplicates win).
+    """
+    table = {}
+    for lang, source, translation in entries:
+        key = _key(lang, source)
+        if key.endswith(b'\t') or not translation.strip():
+            continue
+        table[key] = translation.strip().encode('utf-8')
+    keys = sorted(table)
+
+    def offsets(blobs):
+        position, result = 0, [0]
+        for blob in blobs:
+            position += len(blob)
+            result.append(position)
+        return b''.join(OFFSET.pack(o) for o in result)
+
+    values = [table[key] for key in keys]
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys)))
+        f.write(offsets(keys))
+        f.write(offsets(values))
+        f.write(b''.join(keys))
+        f.write(b''.join(values))
+    return len(keys)
+
+class PhraseTable:
+    """Memory-mapped phrase table checked before any translation backend
+
+    Opening the table maps the file and reads the 10-byte header, so it
+    loads in well under a millisecond whatever its size; pages are only
+    touched by the binary searches that need them. Strings that need no
+    translation (numbers, URLs, text already in the target script) are
+    answered by rule. A missing file leaves only the passthrough rules.
+    """
+    def __init__(self, path=None):
+        path = config.PHRASE_TABLE_PATH if path is None else path
+        self.count = 0
+        self._map = None
+        self.stats = {'lookups': 0, 'table_hits': 0, 'passthrough': 0}
+        if path and os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with open(path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                print(f"Phrase table {path}: not a phrase table file, ignoring")
+                self._map.close()
+                self._map, self.count = None, 0
+        self._key_offsets = HEADER.size
+        self._value_offsets = self._key_offsets + (self.count + 1) * OFFSET.size
+        self._keys = self._value_offsets + (self.count + 1) * OFFSET.size
+        self._values = None
+        if self._map is not None:
+            self._values = self._keys + self._offset(self._key_offsets, self.count)
+
+    def _offset(self, table, index):
+        return OFFSET.unpack_from(self._map, table + index * OFFSET.size)[0]
+
+    def _entry(self, base, table, index):
+        start = self._offset(table, index)
+        end = self._offset(table, index + 1)
+        return self._map[base + start:base + end]
+
+    def _find(self, key):
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(self._keys, self._key_offsets, mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.count and self._entry(self._keys, self._key_offsets, low) == key:
+            return self._entry(self._values, self._value_offsets, low).decode('utf-8')
+        return None
+
+    def lookup(self, text, lang):
+        """Translation from the table or passthrough rules, or None to ask the backend"""
+        self.stats['lookups'] += 1
+        if is_passthrough(text, lang):
+            self.stats['passthrough'] += 1
+            return text
+        if self.count:
+            translated = self._find(_key(lang, text))
+            if translated is not None:
+                self.stats['table_hits'] += 1
+                return translated
+        return None
+
+    def absorbed(self):
+        """Fraction of lookups answered without the backend or translation cache"""
+        lookups = self.stats['lookups']
+        return (self.stats['table_hits'] + self.stats['passthrough']) / lookups if lookups else 0.0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self.count = 0
+
+class NullPhraseTable:
+    """Phrase table that never answers, so every string goes to the cache/backend"""
+    def __init__(self):
+        self.stats = {'lookups': 0, 'table_hits': 0, 'passthrough': 0}
+
+    def lookup(self, text, lang):
+        self.stats['lookups'] += 1
+        return None
+
+    def absorbed(self):
+        return 0.0
+
+    def close(self):
+        pass
+
+def create_phrase_table():
+    if config.PHRASE_TABLE_ENABLED:
+        return PhraseTable()
+    return NullPhraseTable()
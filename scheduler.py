@@ -0,0 +1,152 @@
+import os
+import time
+import config
+
+class SystemLoadSource:
+    """CPU temperature and load read from /sys and /proc"""
+    def __init__(self, thermal_path=None, loadavg_path='/proc/loadavg'):
+        self.thermal_path = config.SCHED_THERMAL_PATH if thermal_path is None else thermal_path
+        self.loadavg_path = loadavg_path
+        self.cpus = os.cpu_count() or 1
+
+    def temperature(self):
+        """SoC temperature in degrees C, or None if unavailable"""
+        try:
+            with open(self.thermal_path) as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def load(self):
+        """1-minute load average per core, or None if unavailable"""
+        try:
+            with open(self.loadavg_path) as f:
+                return float(f.read().split()[0]) / self.cpus
+        except (OSError, ValueError, IndexError):
+            return None
+
+class StaticLoadSource:
+    """Stand-in load source with fixed readings, for tests and benchmarks"""
+    def __init__(self, temperature=None, load=None):
+        self._temperature = temperature
+        self._load = load
+
+    def temperature(self):
+        return self._temperature
+
+    def load(self):
+        return self._load
+
+class FixedScheduler:
+    """Submit every OCR_FRAME_SKIP-th frame, as the app always did"""
+    def __init__(self, frame_skip=None):
+        self.frame_skip = config.OCR_FRAME_SKIP if frame_skip is None else frame_skip
+        self.scale = 1.0
+        self._frames = 0
+        self.stats = {'submitted': 0, 'skipped': 0}
+
+    def should_submit(self, in_flight, capacity=1):
+        self._frames += 1
+        if self._frames % self.frame_skip == 0:
+            return True
+        self.stats['skipped'] += 1
+        return False
+
+    def submitted(self):
+        self.stats['submitted'] += 1
+
+    def record_service_time(self, seconds):
+        pass
+
+class AdaptiveScheduler:
+    """Pace OCR submissions from measured service time, occupancy and thermals
+
+    The next frame is submitted once a worker is free and at least
+    service_time / (capacity * target_utilization) has passed since the
+    last submission, which keeps OCR just below saturation. Above the
+    soft temperature limit the pipeline backs off by stretching that
+    interval, lowering the OCR resolution, or both.
+    """
+    def __init__(self, load_source=None, target_utilization=None, min_interval=None,
+                 max_interval=None, soft_temp=None, hard_temp=None, max_backoff=None,
+                 min_scale=None, strategy=None, load_high=None, sensor_interval=1.0):
+        self.load_source = SystemLoadSource() if load_source is None else load_source
+        self.target_utilization = (config.SCHED_TARGET_UTILIZATION
+                                   if target_utilization is None else target_utilization)
+        self.min_interval = (1.0 / config.CAMERA_FPS if min_interval is None else min_interval)
+        self.max_interval = config.SCHED_MAX_INTERVAL if max_interval is None else max_interval
+        self.soft_temp = config.SCHED_SOFT_TEMP if soft_temp is None else soft_temp
+        self.hard_temp = config.SCHED_HARD_TEMP if hard_temp is None else hard_temp
+        self.max_backoff = config.SCHED_MAX_BACKOFF if max_backoff is None else max_backoff
+        self.min_scale = config.SCHED_MIN_SCALE if min_scale is None else min_scale
+        self.strategy = config.SCHED_THERMAL_STRATEGY if strategy is None else strategy
+        self.load_high = config.SCHED_LOAD_HIGH if load_high is None else load_high
+        self.sensor_interval = sensor_interval
+
+        self.service_time = None  # Moving average of OCR seconds per frame
+        self.scale = 1.0
+        self.interval = self.min_interval
+        self._backoff = 1.0
+        self._last_submit = 0.0
+        self._last_sensor_read = 0.0
+        self.temperature = None
+        self.load = None
+        self.stats = {'submitted': 0, 'deferred_busy': 0, 'deferred_interval': 0}
+
+    def record_service_time(self, seconds):
+        if self.service_time is None:
+            self.service_time = seconds
+        else:
+            self.service_time = 0.8 * self.service_time + 0.2 * seconds
+
+    def _pressure(self):
+        """0 below the soft temperature limit rising to 1 at the hard limit"""
+        if self.temperature is None or self.temperature <= self.soft_temp:
+            return 0.0
+        span = max(self.hard_temp - self.soft_temp, 1e-6)
+        return min((self.temperature - self.soft_temp) / span, 1.0)
+
+    def _refresh(self, now):
+        if now - self._last_sensor_read < self.sensor_interval:
+            return
+        self._last_sensor_read = now
+        self.temperature = self.load_source.temperature()
+        self.load = self.load_source.load()
+
+        pressure = self._pressure()
+        backoff, scale = 1.0, 1.0
+        if self.strategy in ('frequency', 'both'):
+            backoff = 1.0 + pressure * (self.max_backoff - 1.0)
+        if self.strategy in ('resolution', 'both'):
+            scale = 1.0 - pressure * (1.0 - self.min_scale)
+        # Other processes competing for the CPU: slow down proportionally
+        if self.load is not None and self.load > self.load_high:
+            backoff *= self.load / self.load_high
+        self._backoff = backoff
+        self.scale = round(scale, 2)
+
+    def should_submit(self, in_flight, capacity=1):
+        """True if a frame should be submitted now given OCR work in flight"""
+        now = time.time()
+        self._refresh(now)
+        if in_flight >= capacity:
+            self.stats['deferred_busy'] += 1
+            return False
+
+        interval = self.min_interval
+        if self.service_time is not None:
+            interval = self.service_time / (capacity * self.target_utilization)
+        self.interval = min(max(interval * self._backoff, self.min_interval), self.max_interval)
+        if now - self._last_submit < self.interval:
+            self.stats['deferred_interval'] += 1
+            return False
+        return True
+
+    def submitted(self):
+        self._last_submit = time.time()
+        self.stats['submitted'] += 1
+
+def create_scheduler():
+    if config.OCR_SCHEDULER == 'adaptive':
+        return AdaptiveScheduler()
+    return FixedScheduler()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Serve OCR and translation for several frame sources from one shared model pool
+
+Sources can be local cameras, video files, or clients pushing JPEG frames
+over a local TCP socket. All of them share SERVER_OCR_WORKERS OCR processes
+and SERVER_TRANSLATION_WORKERS translation threads, so memory grows with the
+number of workers rather than the number of streams. Each stream keeps at
+most one frame waiting and one in flight: newer frames replace older ones
+(backpressure) and the dispatcher serves streams round-robin (fairness).
+
+Usage:
+    python3 server.py --camera 0 --video lobby.mp4 --listen
+    python3 server.py --client footage.mp4     # push frames to a running server
+"""
+import abc
+import argparse
+import json
+import queue
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+import config
+from capture import CaptureThread
+from fusion import create_fuser
+from ocr_pool import OCRWorkerPool
+from translation_cache import TranslationCache
+
+HEADER = struct.Struct('!I')  # Length prefix of each JPEG frame sent by a client
+
+class Stream(abc.ABC):
+    """One frame source with a single-frame mailbox and its own result fusion"""
+    def __init__(self, name):
+        self.name = name
+        self.fuser = create_fuser()
+        self.lock = threading.Lock()
+        self.closed = False
+        self._pending = None
+        self._frame_no = 0
+        self.in_flight = None  # (frame_no, scale) of the frame being OCR'd
+        self.stats = {'received': 0, 'dropped': 0, 'processed': 0, 'delivered': 0}
+
+    def offer(self, frame):
+        """Queue a new frame, replacing any frame that has not been dispatched yet"""
+        with self.lock:
+            self._frame_no += 1
+            self.stats['received'] += 1
+            if self._pending is not None:
+                self.stats['dropped'] += 1
+            self._pending = (self._frame_no, frame)
+
+    def take(self):
+        """Next frame to OCR, or None if nothing is waiting or one is in flight"""
+        with self.lock:
+            if self._pending is None or self.in_flight is not None:
+                return None
+            pending, self._pending = self._pending, None
+            return pending
+
+    def put_back(self, item):
+        """Return a taken frame to the mailbox unless a newer one has arrived"""
+        with self.lock:
+            if self._pending is None:
+                self._pending = item
+            else:
+                self.stats['dropped'] += 1
+
+    @abc.abstractmethod
+    def start(self, on_frame):
+        """Begin producing frames, calling on_frame after each offer"""
+
+    @abc.abstractmethod
+    def deliver(self, frame_no, results):
+        """Hand translated results for frame_no back to the source"""
+
+    def close(self):
+        self.closed = True
+
+class PrintStream(Stream):
+    """Local camera or video file; results are printed as JSON lines"""
+    def __init__(self, name, src):
+        super().__init__(name)
+        self.capture = CaptureThread(src=src, width=config.CAMERA_WIDTH,
+                                     height=config.CAMERA_HEIGHT)
+
+    def start(self, on_frame):
+        self.capture.start()
+
+        def feed():
+            last_seq = 0
+            while not self.closed and self.capture.running:
+                frame = self.capture.read_next(last_seq, timeout=config.WORKER_TIMEOUT)
+                if frame is None:
+                    continue
+                last_seq = frame.seq
+                # Copy so the capture ring buffer is not held while waiting for OCR
+                self.offer(np.array(frame))
+                on_frame()
+        threading.Thread(target=feed, daemon=True).start()
+
+    def deliver(self, frame_no, results):
+        self.stats['delivered'] += 1
+        print(json.dumps({'stream': self.name, 'frame': frame_no, 'results': results},
+                         ensure_ascii=False), flush=True)
+
+    def close(self):
+        super().close()
+        self.capture.stop()
+
+class SocketStream(Stream):
+    """Client pushing length-prefixed JPEG frames; results are sent back as JSON lines"""
+    def __init__(self, name, conn):
+        super().__init__(name)
+        self.conn = conn
+        self.send_lock = threading.Lock()
+
+    def _recv_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.conn.recv(size - len(data))
+            if not chunk:
+                return None
+            data.extend(chunk)
+        return bytes(data)
+
+    def start(self, on_frame):
+        def read():
+            try:
+                while not self.closed:
+                    header = self._recv_exact(HEADER.size)
+                    if header is None:
+                        break
+                    payload = self._recv_exact(HEADER.unpack(header)[0])
+                    if payload is None:
+                        break
+                    frame = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+                    if frame is not None:
+                        self.offer(frame)
+                        on_frame()
+            except OSError:
+                pass
+            self.close()
+        threading.Thread(target=read, daemon=True).start()
+
+    def deliver(self, frame_no, results):
+        line = json.dumps({'frame': frame_no, 'results': results}, ensure_ascii=False) + '\n'
+        try:
+            with self.send_lock:
+                self.conn.sendall(line.encode('utf-8'))
+            self.stats['delivered'] += 1
+        except OSError:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+
+class OCRServer:
+    """Multiplex many streams onto a shared OCR process pool and translation threads"""
+    def __init__(self, target_lang='hi', ocr_workers=None, translation_workers=None):
+        self.target_lang = target_lang
+        ocr_workers = config.SERVER_OCR_WORKERS if ocr_workers is None else ocr_workers
+        translation_workers = (config.SERVER_TRANSLATION_WORKERS
+                               if translation_workers is None else translation_workers)
+        self.pool = OCRWorkerPool(self._on_ocr_result, num_workers=ocr_workers,
+                                  slots=ocr_workers + 1)
+        self.cache = TranslationCache()
+        self.translation_queues = [queue.Queue(maxsize=config.MAX_QUEUE_SIZE * 4)
+                                   for _ in range(translation_workers)]
+        self.streams = []
+        self.lock = threading.Condition()
+        self.running = False
+        self._next_stream = 0
+        self._listener = None
+        self.stats = {'translation_dropped': 0, 'submit_errors': 0}
+
+    def add_stream(self, stream):
+        with self.lock:
+            self.streams.append(stream)
+        stream.start(self._wake)
+
+    def _wake(self):
+        with self.lock:
+            self.lock.notify()
+
+    def start(self):
+        """Start the OCR pool and worker threads; RuntimeError if no OCR worker loads its model"""
+        self.running = True
+        self.pool.start()
+        if not self.pool.wait_ready(config.OCR_WORKER_START_TIMEOUT):
+            raise RuntimeError("OCR workers did not start: "
+                               + ('; '.join(self.pool.errors) or 'timeout'))
+        for worker_queue in self.translation_queues:
+            threading.Thread(target=self._translation_worker, args=(worker_queue,),
+                             daemon=True).start()
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _fit(self, frame):
+        """Downscale frames larger than the shared ring buffers"""
+        height, width = frame.shape[:2]
+        ring_h, ring_w = self.pool.ring_shape[1:3]
+        factor = min(ring_w / width, ring_h / height, 1.0)
+        if factor < 1.0:
+            frame = cv2.resize(frame, (int(width * factor), int(height * factor)),
+                               interpolation=cv2.INTER_AREA)
+        return frame, factor
+
+    def _dispatch(self):
+        # Round-robin over streams, one frame per stream per turn, while workers are free
+        while self.running:
+            with self.lock:
+                self.streams = [s for s in self.streams if not s.closed]
+                submitted = False
+                if self.pool.in_flight() < self.pool.num_workers and self.streams:
+                    count = len(self.streams)
+                    for offset in range(count):
+                        stream = self.streams[(self._next_stream + offset) % count]
+                        item = stream.take()
+                        if item is None:
+                            continue
+                        frame_no, frame = item
+                        try:
+                            frame, factor = self._fit(frame)
+                            stream.in_flight = (frame_no, factor)
+                            submitted = self.pool.submit(frame, stream=stream)
+                        except Exception as e:
+                            # Reported and dropped: retrying the same frame would likely fail again
+                            stream.in_flight = None
+                            stream.stats['dropped'] += 1
+                            self.stats['submit_errors'] += 1
+                            print(f"{stream.name}: OCR submit of frame {frame_no} failed: {e}",
+                                  file=sys.stderr)
+                            break
+                        if submitted:
+                            self._next_stream = (self._next_stream + offset + 1) % count
+                        else:
+                            # No free ring slot: keep the frame for the next turn
+                            stream.in_flight = None
+                            stream.put_back(item)
+                        break
+                if not submitted:
+                    self.lock.wait(config.WORKER_TIMEOUT)
+
+    def _on_ocr_result(self, frame, results, elapsed, stream):
+        frame_no, factor = stream.in_flight
+        if factor < 1.0:
+            results = [dict(r, bbox=tuple(int(v / factor) for v in r['bbox'])) for r in results]
+        stream.stats['processed'] += 1
+        stream.in_flight = None
+        self._wake()
+
+        # Same stream always goes to the same translation thread to keep its order
+        worker_queue = self.translation_queues[hash(stream.name) % len(self.translation_queues)]
+        try:
+            worker_queue.put_nowait((stream, frame_no, results))
+        except queue.Full:
+            self.stats['translation_dropped'] += 1
+
+    def _translation_worker(self, worker_queue):
+        from translate import TranslationProcessor
+        translator = TranslationProcessor(self.target_lang, cache=self.cache)
+        while self.running:
+            try:
+                stream, frame_no, results = worker_queue.get(timeout=config.WORKER_TIMEOUT)
+            except queue.Empty:
+                continue
+            if stream.closed:
+                continue
+            translated = translator.process(stream.fuser.update(results))
+            stream.deliver(frame_no, translated)
+
+    def listen(self, host=None, port=None):
+        host = config.SERVER_HOST if host is None else host
+        port = config.SERVER_PORT if port is None else port
+        self._listener = socket.create_server((host, port))
+
+        def accept():
+            count = 0
+            while self.running:
+                try:
+                    conn, addr = self._listener.accept()
+                except OSError:
+                    break
+                count += 1
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.add_stream(SocketStream(f'client{count}', conn))
+        threading.Thread(target=accept, daemon=True).start()
+        print(f"Listening on {host}:{port}", file=sys.stderr)
+
+    def stop(self):
+        self.running = False
+        if self._listener is not None:
+            self._listener.close()
+        with self.lock:
+            for stream in self.streams:
+                stream.close()
+                print(f"{stream.name}: {stream.stats}", file=sys.stderr)
+        self.pool.stop()
+        self.cache.close()
+
+def run_client(source, host=None, port=None, quality=80):
+    """Push frames from a camera or file to the server and print results"""
+    host = config.SERVER_HOST if host is None else host
+    port = config.SERVER_PORT if port is None else port
+    conn = socket.create_connection((host, port))
+
+    def receive():
+        with conn.makefile('r', encoding='utf-8') as lines:
+            for line in lines:
+                print(line.rstrip(), flush=True)
+    threading.Thread(target=receive, daemon=True).start()
+
+    capture = CaptureThread(src=source, width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT)
+    capture.start()
+    last_seq = 0
+    last_frame = time.time()
+    try:
+        while capture.running:
+            frame = capture.read_next(last_seq, timeout=1.0)
+            if frame is None:
+                # Read errors are retried; give up once the source stays unreadable
+                # (end of a file, camera unplugged)
+                if (capture.stats['read_errors'] and
+                        time.time() - last_frame > config.SERVER_CLIENT_SOURCE_TIMEOUT):
+                    break
+                continue
+            last_seq = frame.seq
+            last_frame = time.time()
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok:
+                conn.sendall(HEADER.pack(len(jpeg)) + jpeg.tobytes())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.stop()
+        conn.close()
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--camera', type=int, action='append', default=[],
+                        help='local camera index (repeatable)')
+    parser.add_argument('--video', action='append', default=[],
+                        help='video file or image folder (repeatable)')
+    parser.add_argument('--listen', action='store_true', help='accept frames over TCP')
+    parser.add_argument('--host', default=config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT)
+    parser.add_argument('--lang', default='hi')
+    parser.add_argument('--ocr-workers', type=int)
+    parser.add_argument('--translation-workers', type=int)
+    parser.add_argument('--client', metavar='SOURCE', help='run as a client pushing SOURCE')
+    args = parser.parse_args()
+
+    if args.client is not None:
+        source = int(args.client) if args.client.isdigit() else args.client
+        run_client(source, args.host, args.port)
+        return
+
+    server = OCRServer(args.lang, args.ocr_workers, args.translation_workers)
+    # SIGTERM takes the KeyboardInterrupt path so the pool and shared memory are released
+    signal.signal(signal.SIGTERM, _interrupt)
+    status = 0
+    try:
+        server.start()
+        for index in args.camera:
+            server.add_stream(PrintStream(f'camera{index}', index))
+        for path in args.video:
+            server.add_stream(PrintStream(path, path))
+        if args.listen:
+            server.listen(args.host, args.port)
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        status = 1
+    finally:
+        server.stop()
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
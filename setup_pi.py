@@ -26,6 +26,10 @@ def setup_tesseract():
         print("Failed to install Tesseract")
         return False
         
+    # TrueType font and shaping library for non-Latin overlay labels
+    if not run_command("sudo apt install -y fonts-noto-core libraqm0"):
+        print("Failed to install label fonts; labels will use Hershey fonts")
+        
     # Set environment variable for better performance
     os.environ['OMP_THREAD_LIMIT'] = '2'
     
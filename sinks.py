@@ -0,0 +1,177 @@
+import os
+import time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+import config
+
+class WindowSink:
+    """OpenCV window; q quits"""
+    name = 'window'
+
+    def __init__(self, title=None):
+        self.title = config.DISPLAY_WINDOW_NAME if title is None else title
+        self.stats = {'frames': 0, 'seconds': 0.0}
+
+    def show(self, frame):
+        """Show a composed frame; return False when the user asks to quit"""
+        start = time.perf_counter()
+        cv2.imshow(self.title, frame)
+        keep_running = cv2.waitKey(1) & 0xFF != ord('q')
+        self.stats['seconds'] += time.perf_counter() - start
+        self.stats['frames'] += 1
+        return keep_running
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+class FramebufferSink:
+    """Linux framebuffer device such as the glasses' display, written through mmap
+
+    Geometry and pixel depth come from /sys/class/graphics/<fb>; frames are
+    scaled to the panel and converted to BGRA (32 bpp) or BGR565 (16 bpp).
+    """
+    name = 'framebuffer'
+
+    def __init__(self, path=None):
+        self.path = config.DISPLAY_FRAMEBUFFER if path is None else path
+        sysfs = os.path.join('/sys/class/graphics', os.path.basename(self.path))
+        with open(os.path.join(sysfs, 'virtual_size')) as f:
+            self.width, self.height = (int(v) for v in f.read().strip().split(','))
+        with open(os.path.join(sysfs, 'bits_per_pixel')) as f:
+            self.bpp = int(f.read())
+        with open(os.path.join(sysfs, 'stride')) as f:
+            stride = int(f.read())
+        if self.bpp not in (16, 32):
+            raise ValueError(f"{self.path}: unsupported {self.bpp} bits per pixel")
+        self.conversion = cv2.COLOR_BGR2BGRA if self.bpp == 32 else cv2.COLOR_BGR2BGR565
+        self._fb = np.memmap(self.path, dtype=np.uint8, mode='r+',
+                             shape=(self.height, stride))
+        self._row_bytes = self.width * self.bpp // 8
+        self.stats = {'frames': 0, 'seconds': 0.0}
+
+    def show(self, frame):
+        start = time.perf_counter()
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+        pixels = cv2.cvtColor(frame, self.conversion)
+        self._fb[:, :self._row_bytes] = pixels.reshape(self.height, self._row_bytes)
+        self.stats['seconds'] += time.perf_counter() - start
+        self.stats['frames'] += 1
+        return True
+
+    def close(self):
+        del self._fb
+
+class SharedMemorySink:
+    """Latest frame in a named shared memory block for another process to display
+
+    Layout: a 16-byte header (uint64 sequence, uint32 height, uint32 width)
+    followed by the BGR pixels. The sequence is odd while a frame is being
+    written; readers retry if it is odd or changed during their copy.
+    """
+    name = 'shm'
+    HEADER_BYTES = 16
+
+    def __init__(self, shm_name=None):
+        self.shm_name = config.DISPLAY_SHM_NAME if shm_name is None else shm_name
+        self._shm = None
+        self._header = None
+        self._pixels = None
+        self._seq = 0
+        self.stats = {'frames': 0, 'seconds': 0.0}
+
+    def _open(self, shape):
+        self.close()
+        size = self.HEADER_BYTES + int(np.prod(shape))
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.shm_name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous run: replace it
+            stale = shared_memory.SharedMemory(name=self.shm_name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=self.shm_name, create=True, size=size)
+        self._header = np.ndarray(4, dtype=np.uint32, buffer=self._shm.buf)
+        self._pixels = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf,
+                                  offset=self.HEADER_BYTES)
+
+    def _set_seq(self, seq):
+        self._header[0] = seq & 0xFFFFFFFF
+        self._header[1] = seq >> 32
+
+    def show(self, frame):
+        start = time.perf_counter()
+        if self._pixels is None or self._pixels.shape != frame.shape:
+            self._open(frame.shape)
+        self._set_seq(self._seq + 1)
+        self._header[2], self._header[3] = frame.shape[:2]
+        np.copyto(self._pixels, frame)
+        self._seq += 2
+        self._set_seq(self._seq)
+        self.stats['seconds'] += time.perf_counter() - start
+        self.stats['frames'] += 1
+        return True
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._header = self._pixels = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+class VideoSink:
+    """Encoded video file of the composed output"""
+    name = 'video'
+
+    def __init__(self, path=None, fps=None, fourcc=None):
+        self.path = config.DISPLAY_VIDEO_PATH if path is None else path
+        self.fps = config.CAMERA_FPS if fps is None else fps
+        self.fourcc = config.DISPLAY_VIDEO_FOURCC if fourcc is None else fourcc
+        self._writer = None
+        self.stats = {'frames': 0, 'seconds': 0.0}
+
+    def show(self, frame):
+        start = time.perf_counter()
+        if self._writer is None:
+            # Opened on the first frame so the size matches what is composed
+            height, width = frame.shape[:2]
+            self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                           self.fps, (width, height))
+        self._writer.write(np.ascontiguousarray(frame))
+        self.stats['seconds'] += time.perf_counter() - start
+        self.stats['frames'] += 1
+        return True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+class NullSink:
+    """Discards frames; measures the pipeline without display cost"""
+    name = 'null'
+
+    def __init__(self):
+        self.stats = {'frames': 0, 'seconds': 0.0}
+
+    def show(self, frame):
+        self.stats['frames'] += 1
+        return True
+
+    def close(self):
+        pass
+
+def create_sink(name=None):
+    """Display sink selected by DISPLAY_SINK"""
+    name = config.DISPLAY_SINK if name is None else name
+    if name == 'framebuffer':
+        return FramebufferSink()
+    if name == 'shm':
+        return SharedMemorySink()
+    if name == 'video':
+        return VideoSink()
+    if name == 'null':
+        return NullSink()
+    return WindowSink()
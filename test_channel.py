@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Latest-wins channel between pipeline stages
+
+Overwrite-oldest when full, sequence numbers, close and get timeouts.
+"""
+import threading
+import time
+from channel import Channel
+
+def test_overwrites_oldest():
+    """A full channel drops its oldest item and keeps the newest"""
+    channel = Channel('test', capacity=2)
+    assert channel.put('a') is False
+    assert channel.put('b') is False
+    assert channel.put('c') is True
+    assert channel.pending() == 2
+    assert [channel.get_nowait()[1] for _ in range(2)] == ['b', 'c']
+    assert channel.stats == {'put': 3, 'taken': 2, 'overwritten': 1}
+    print("Channel: oldest item overwritten when full")
+
+def test_sequence_numbers():
+    """Every put gets the next seq, so a consumer can count what it skipped"""
+    channel = Channel('test')
+    for item in 'abcd':
+        channel.put(item)
+    assert channel.seq == 4
+    seq, item = channel.get_nowait()
+    assert (seq, item) == (4, 'd')
+    channel.put('e')
+    assert channel.get_nowait() == (5, 'e')
+    print("Channel: sequence numbers count overwritten items")
+
+def test_get_timeout():
+    """get returns None once the timeout passes with nothing published"""
+    channel = Channel('test')
+    assert channel.get_nowait() is None
+    start = time.monotonic()
+    assert channel.get(timeout=0.05) is None
+    assert time.monotonic() - start >= 0.05
+    assert channel.stats['taken'] == 0
+    print("Channel: get times out empty")
+
+def test_close_wakes_consumers():
+    """close wakes a blocked consumer; pending items are still drained first"""
+    channel = Channel('test')
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(channel.get()))
+    consumer.start()
+    time.sleep(0.05)
+    channel.close()
+    consumer.join(timeout=1)
+    assert not consumer.is_alive() and got == [None]
+
+    channel = Channel('test')
+    channel.put('last')
+    channel.close()
+    assert channel.get() == (1, 'last')
+    assert channel.get() is None
+    print("Channel: close wakes consumers after draining")
+
+def test_get_wakes_on_put():
+    """A blocked consumer receives an item published from another thread"""
+    channel = Channel('test')
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(channel.get(timeout=1)))
+    consumer.start()
+    time.sleep(0.05)
+    channel.put('frame')
+    consumer.join(timeout=1)
+    assert got == [(1, 'frame')]
+    print("Channel: put wakes a waiting consumer")
+
+if __name__ == "__main__":
+    test_overwrites_oldest()
+    test_sequence_numbers()
+    test_get_timeout()
+    test_close_wakes_consumers()
+    test_get_wakes_on_put()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Frame selection before OCR
+
+Blurry and unchanged frames are skipped, changed frames and stale scenes
+are accepted, and only frames actually submitted count as accepted.
+"""
+import time
+import cv2
+import numpy as np
+from frame_select import FrameSelector, PassThroughSelector
+
+def make_frame(text='EXIT', x=40):
+    frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+    cv2.putText(frame, text, (x, 140), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (255, 255, 255), 6)
+    return frame
+
+def selector(max_interval=10.0):
+    return FrameSelector(diff_threshold=6.0, sharpness_threshold=60.0, size=(64, 48),
+                         max_interval=max_interval)
+
+def test_skips_unchanged_and_accepts_changed():
+    frames = selector()
+    assert frames.select(make_frame())
+    frames.commit()
+    assert not frames.select(make_frame())
+    assert frames.select(make_frame('STOP', x=120))
+    frames.commit()
+    assert frames.stats == {'accepted': 2, 'skipped_unchanged': 1, 'skipped_blurry': 0}
+    print("Frame selection: unchanged frame skipped, changed frame accepted")
+
+def test_skips_blurry():
+    frames = selector()
+    assert not frames.select(cv2.GaussianBlur(make_frame(), (31, 31), 12))
+    assert not frames.select(np.full((240, 320, 3), 40, dtype=np.uint8))
+    assert frames.stats['skipped_blurry'] == 2 and frames.stats['accepted'] == 0
+    print(f"Frame selection: blurry frames skipped (sharpness {frames.last_sharpness:.1f})")
+
+def test_stale_scene_reaccepted():
+    frames = selector(max_interval=0.05)
+    assert frames.select(make_frame())
+    frames.commit()
+    time.sleep(0.1)
+    assert frames.select(make_frame())
+    print("Frame selection: unchanged scene re-OCR'd after max_interval")
+
+def test_accepted_counts_only_submitted():
+    """A selected frame the OCR stage rejects is neither counted nor the new reference"""
+    frames = selector()
+    assert frames.select(make_frame())  # Submission fails: no commit
+    assert frames.stats['accepted'] == 0
+    assert frames.select(make_frame())  # Still compared against no reference
+    frames.commit()
+    assert frames.stats['accepted'] == 1
+
+    passthrough = PassThroughSelector()
+    assert passthrough.select(make_frame()) and passthrough.stats['accepted'] == 0
+    passthrough.commit()
+    assert passthrough.stats['accepted'] == 1
+    print("Frame selection: only submitted frames counted as accepted")
+
+if __name__ == "__main__":
+    test_skips_unchanged_and_accepts_changed()
+    test_skips_blurry()
+    test_stale_scene_reaccepted()
+    test_accepted_counts_only_submitted()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Temporal OCR fusion
+
+Hit and miss counting per track, emission once a reading wins the vote,
+and track expiry after too many missed passes.
+"""
+from fusion import ResultFuser
+
+def read(text, x=10, confidence=90):
+    return {'text': text, 'bbox': (x, 50, 100, 30), 'confidence': confidence}
+
+def test_hits_gate_emission():
+    """A reading is emitted only after min_hits passes agree"""
+    fuser = ResultFuser(iou_threshold=0.5, min_hits=2, min_share=0.6, decay=1.0, max_misses=1)
+    assert fuser.update([read('EXIT')]) == []
+    fused = fuser.update([read('EXIT')])
+    assert [r['text'] for r in fused] == ['EXIT']
+    assert fuser._tracks[0].hits == 2 and fuser._tracks[0].misses == 0
+    print("Fusion: emitted after two agreeing passes")
+
+def test_vote_settles_misreads():
+    """A one-off misread does not replace the winning reading"""
+    fuser = ResultFuser(iou_threshold=0.5, min_hits=2, min_share=0.6, decay=1.0, max_misses=1)
+    for text in ['EXIT', 'EXIT', 'EX1T', 'EXIT']:
+        fused = fuser.update([read(text)])
+    assert len(fuser._tracks) == 1
+    assert [r['text'] for r in fused] == ['EXIT']
+    print("Fusion: misread outvoted")
+
+def test_misses_and_expiry():
+    """Missed final passes are counted, hidden, and expire the track past max_misses"""
+    fuser = ResultFuser(iou_threshold=0.5, min_hits=1, min_share=0.5, decay=1.0, max_misses=1)
+    fuser.update([read('EXIT'), read('STOP', x=300)])
+    fused = fuser.update([read('STOP', x=300)])
+    exit_track = next(t for t in fuser._tracks if t.votes.get('EXIT'))
+    assert exit_track.misses == 1
+    assert [r['text'] for r in fused] == ['STOP']
+    fuser.update([read('STOP', x=300)])
+    assert [t.best()[0] for t in fuser._tracks] == ['STOP']
+    print("Fusion: missed track expires after max_misses")
+
+def test_partial_passes_count_once():
+    """Pieces of one pass are one hit, and misses wait for the final piece"""
+    fuser = ResultFuser(iou_threshold=0.5, min_hits=1, min_share=0.5, decay=1.0, max_misses=0)
+    fuser.update([read('EXIT'), read('STOP', x=300)])
+    fuser.update([read('EXIT')], final=False)
+    assert len(fuser._tracks) == 2 and all(t.misses == 0 for t in fuser._tracks)
+    fuser.update([read('STOP', x=300)], final=True)
+    assert [(t.hits, t.misses) for t in fuser._tracks] == [(2, 0), (2, 0)]
+    print("Fusion: partial pass counted as one hit")
+
+if __name__ == "__main__":
+    test_hits_gate_emission()
+    test_vote_settles_misreads()
+    test_misses_and_expiry()
+    test_partial_passes_count_once()
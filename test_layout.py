@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Line and block assembly of OCR fragments
+
+Component labelling, word-to-line and line-to-block grouping, reading
+order and the merged bbox and confidence of each unit.
+"""
+import numpy as np
+from layout import LayoutAssembler, _components
+
+def word(text, x, y, w, h=30, confidence=80):
+    return {'text': text, 'bbox': (x, y, w, h), 'confidence': confidence}
+
+# A two-line sign plus an unrelated word far to the right
+SIGN = [word('PARKING', 90, 10, 140),
+        word('NO', 20, 10, 50, confidence=60),
+        word('AFTER', 20, 50, 100),
+        word('6PM', 130, 50, 70),
+        word('EXIT', 500, 200, 80)]
+
+def test_components():
+    """Chains join into one component labelled by their smallest index"""
+    adjacent = np.zeros((5, 5), dtype=bool)
+    for a, b in [(0, 3), (3, 4), (1, 2)]:
+        adjacent[a, b] = adjacent[b, a] = True
+    assert _components(adjacent).tolist() == [0, 1, 1, 0, 0]
+    assert _components(np.zeros((3, 3), dtype=bool)).tolist() == [0, 1, 2]
+    print("Layout: connected components labelled")
+
+def test_lines():
+    """Words join along a line in left-to-right order, lines stay separate"""
+    units = LayoutAssembler(mode='lines', word_gap=1.0, line_overlap=0.5,
+                            line_gap=0.6, height_ratio=1.6).assemble(SIGN)
+    assert [u['text'] for u in units] == ['NO PARKING', 'AFTER 6PM', 'EXIT']
+    assert units[0]['bbox'] == (20, 10, 210, 30)
+    # Width-weighted: 50 px at 60 and 140 px at 80
+    assert units[0]['confidence'] == round((50 * 60 + 140 * 80) / 190)
+    print("Layout: words grouped into lines")
+
+def test_blocks():
+    """Stacked, overlapping lines join one block; distant text does not"""
+    assembler = LayoutAssembler(mode='blocks', word_gap=1.0, line_overlap=0.5,
+                                line_gap=0.6, height_ratio=1.6)
+    units = assembler.assemble(SIGN)
+    assert [u['text'] for u in units] == ['NO PARKING AFTER 6PM', 'EXIT']
+    assert units[0]['bbox'] == (20, 10, 210, 70)
+    assert units[1]['bbox'] == (500, 200, 80, 30)
+    assert assembler.stats == {'fragments': 5, 'units': 2}
+    print("Layout: lines grouped into blocks")
+
+def test_height_ratio_splits():
+    """A heading much taller than the text beside it stays its own unit"""
+    words = [word('SALE', 10, 10, 200, h=90), word('today', 220, 40, 60, h=30)]
+    units = LayoutAssembler(mode='lines', word_gap=1.0, line_overlap=0.5,
+                            line_gap=0.6, height_ratio=1.6).assemble(words)
+    assert [u['text'] for u in units] == ['SALE', 'today']
+    print("Layout: different text heights not merged")
+
+if __name__ == "__main__":
+    test_components()
+    test_lines()
+    test_blocks()
+    test_height_ratio_splits()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped phrase table
+
+Build/load round-trip through a CSV, lookup hits on normalized text,
+misses that fall through to the backend, and the passthrough rules.
+"""
+import os
+import tempfile
+from build_phrase_table import read_entries
+from phrase_table import PhraseTable, build
+
+CSV = """text,hi,es
+EXIT,निकास,SALIDA
+No Parking,पार्किंग निषेध,
+Pull,खींचें,TIRAR
+exit,बाहर,
+"""
+
+def build_table(directory):
+    source = os.path.join(directory, 'phrases.csv')
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write(CSV)
+    path = os.path.join(directory, 'phrases.bin')
+    return build(read_entries(source), path), path
+
+def test_round_trip():
+    """Every entry written is read back; later duplicates win"""
+    with tempfile.TemporaryDirectory() as directory:
+        count, path = build_table(directory)
+        assert count == 5  # "exit" replaces "EXIT" for hi, empty cells skipped
+        table = PhraseTable(path)
+        assert table.count == count
+        assert table.lookup('EXIT', 'hi') == 'बाहर'
+        assert table.lookup('EXIT', 'es') == 'SALIDA'
+        assert table.lookup('No Parking', 'hi') == 'पार्किंग निषेध'
+        assert table.lookup('PULL', 'es') == 'TIRAR'
+        table.close()
+    print(f"Phrase table: {count} entries round-tripped")
+
+def test_lookup_hits_and_misses():
+    """Normalized text hits; unknown text and missing languages go to the backend"""
+    with tempfile.TemporaryDirectory() as directory:
+        _, path = build_table(directory)
+        table = PhraseTable(path)
+        assert table.lookup('  no   PARKING. ', 'hi') == 'पार्किंग निषेध'
+        assert table.lookup('No Parking', 'es') is None
+        assert table.lookup('ENTRY', 'hi') is None
+        assert table.lookup('Pull', 'fr') is None
+        assert table.stats == {'lookups': 4, 'table_hits': 1, 'passthrough': 0}
+        assert table.absorbed() == 0.25
+        table.close()
+    print("Phrase table: hits and misses counted")
+
+def test_passthrough_and_missing_file():
+    """Numbers, URLs and target-script text need no table; a missing file only passes through"""
+    table = PhraseTable(os.path.join(tempfile.gettempdir(), 'no-such-phrase-table.bin'))
+    assert table.count == 0
+    assert table.lookup('12:30', 'hi') == '12:30'
+    assert table.lookup('www.example.com', 'hi') == 'www.example.com'
+    assert table.lookup('निकास', 'hi') == 'निकास'
+    assert table.lookup('EXIT', 'hi') is None
+    assert table.stats['passthrough'] == 3
+    print("Phrase table: passthrough rules without a table")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_lookup_hits_and_misses()
+    test_passthrough_and_missing_file()
@@ -2,9 +2,24 @@
 """
 Test EasyOCR precision with sample text images
 """
+import time
 import cv2
 import numpy as np
 from ocr import OCRProcessor
+from ocr_backends import EasyOCRBackend, ONNXBackend
+
+TEST_TEXTS = [
+    "Hello World",
+    "Python Programming", 
+    "Machine Learning",
+    "Computer Vision",
+    "Real Time Processing",
+    "Text Recognition",
+    "123 Main Street",
+    "OpenCV EasyOCR"
+]
+
+DETECT_SCALES = [1.0, 0.75, 0.5, 0.35]
 
 def create_test_image(text, font_size=40):
     """Create a test image with text"""
@@ -26,16 +41,7 @@ def test_easyocr_precision():
     print("Initializing EasyOCR...")
     ocr = OCRProcessor()
     
-    test_texts = [
-        "Hello World",
-        "Python Programming", 
-        "Machine Learning",
-        "Computer Vision",
-        "Real Time Processing",
-        "Text Recognition",
-        "123 Main Street",
-        "OpenCV EasyOCR"
-    ]
+    test_texts = TEST_TEXTS
     
     print("Testing EasyOCR Precision...")
     print("=" * 60)
@@ -75,5 +81,86 @@ def test_easyocr_precision():
     else:
         print("⚠️  Check EasyOCR installation")
 
+def create_scene_image(text, font_size=40, width=640, height=480):
+    """Camera-sized frame with the test text placed off-centre"""
+    img = np.full((height, width, 3), 235, dtype=np.uint8)
+    line = create_test_image(text, font_size)
+    y = height // 3
+    img[y:y + line.shape[0], 20:20 + line.shape[1]] = line
+    return img
+
+def test_detection_scales():
+    """Accuracy and speed of downscaled detection with full-resolution recognition"""
+    print("Initializing EasyOCR...")
+    ocr = OCRProcessor()
+    ocr.cache = None  # Measure the recognizer every time
+    
+    print("Testing detection scales (normal and small text)...")
+    print("=" * 60)
+    
+    for scale in DETECT_SCALES:
+        ocr.detect_scale = scale
+        ocr.detect_stats['small_text_fallbacks'] = 0
+        ocr.process(create_scene_image(TEST_TEXTS[0]))  # Warm up this scale
+        
+        for font_size in (40, 20):
+            correct = 0
+            elapsed = 0.0
+            for text in TEST_TEXTS:
+                img = create_scene_image(text, font_size)
+                start = time.time()
+                results = ocr.process(img)
+                elapsed += time.time() - start
+                detected = " ".join(r['text'] for r in results).lower().replace(" ", "")
+                if text.lower().replace(" ", "") in detected:
+                    correct += 1
+            
+            accuracy = correct / len(TEST_TEXTS) * 100
+            ms = elapsed / len(TEST_TEXTS) * 1000
+            print(f"scale {scale:4.2f} font {font_size:2d}: accuracy {accuracy:5.1f}%  "
+                  f"{ms:6.1f} ms/frame")
+        print(f"  small-text fallbacks: {ocr.detect_stats['small_text_fallbacks']}")
+    print("=" * 60)
+
+def test_backend_comparison(model_dir='models', runs=3):
+    """Side-by-side speed and accuracy of the EasyOCR and ONNX Runtime backends"""
+    backends = [('easyocr', lambda: EasyOCRBackend()),
+                ('onnx fp32', lambda: ONNXBackend(model_dir, int8=False)),
+                ('onnx int8', lambda: ONNXBackend(model_dir, int8=True))]
+    images = [(text, create_scene_image(text, font_size))
+              for font_size in (40, 20) for text in TEST_TEXTS]
+    
+    print("Comparing OCR backends...")
+    print("=" * 60)
+    
+    for name, factory in backends:
+        try:
+            backend = factory()
+        except Exception as e:  # Missing onnxruntime or exported models
+            print(f"{name:10}: unavailable ({e})")
+            continue
+        ocr = OCRProcessor(backend=backend)
+        ocr.cache = None  # Measure the recognizer every time
+        ocr.process(images[0][1])  # Warm up
+        
+        correct = 0
+        elapsed = 0.0
+        for text, img in images:
+            for _ in range(runs):
+                start = time.time()
+                results = ocr.process(img)
+                elapsed += time.time() - start
+            detected = " ".join(r['text'] for r in results).lower().replace(" ", "")
+            if text.lower().replace(" ", "") in detected:
+                correct += 1
+        
+        accuracy = correct / len(images) * 100
+        ms = elapsed / (len(images) * runs) * 1000
+        load = sum(ocr.load_times.values())
+        print(f"{name:10}: accuracy {accuracy:5.1f}%  {ms:6.1f} ms/frame  load {load:5.1f} s")
+    print("=" * 60)
+
 if __name__ == "__main__":
     test_easyocr_precision()
+    test_detection_scales()
+    test_backend_comparison()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Overlay tracking between OCR passes
+
+Textured results follow the frame; results too featureless to track stay
+drawn in place until the next OCR pass.
+"""
+import cv2
+import numpy as np
+from tracking import OverlayTracker
+
+TEXT = {'text': 'EXIT', 'bbox': (20, 40, 150, 60), 'confidence': 90}
+BLANK = {'text': 'blank', 'bbox': (200, 150, 80, 40), 'confidence': 90}
+
+def make_frame(shift=0):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    cv2.putText(frame, 'EXIT', (30 + shift, 85), cv2.FONT_HERSHEY_SIMPLEX, 1.5,
+                (255, 255, 255), 3)
+    return frame
+
+def test_textured_result_follows_motion():
+    tracker = OverlayTracker(scale=1.0, min_features=3)
+    tracker.set_results([TEXT], make_frame())
+    moved = tracker.update(make_frame(shift=6))
+    assert len(moved) == 1
+    assert abs(moved[0]['bbox'][0] - (TEXT['bbox'][0] + 6)) <= 1, moved
+    assert tracker.stats == {'tracks_started': 1, 'tracks_lost': 0, 'untracked': 0}
+    print("Tracking: textured result moved with the frame")
+
+def test_featureless_result_stays_until_next_pass():
+    tracker = OverlayTracker(scale=1.0, min_features=3)
+    tracker.set_results([TEXT, BLANK], make_frame())
+    for shift in (3, 6):
+        shown = tracker.update(make_frame(shift))
+        assert [r['text'] for r in shown] == ['EXIT', 'blank']
+        assert shown[1]['bbox'] == BLANK['bbox']
+    assert tracker.stats['untracked'] == 1 and tracker.stats['tracks_lost'] == 0
+    tracker.set_results([TEXT], make_frame(6))
+    assert [r['text'] for r in tracker.update(make_frame(6))] == ['EXIT']
+    print("Tracking: featureless result drawn in place until replaced")
+
+if __name__ == "__main__":
+    test_textured_result_follows_motion()
+    test_featureless_result_stays_until_next_pass()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Translation cache tiers
+
+Memory TTL expiry, LRU eviction with reload from the sqlite tier (which
+must not restart the TTL), rows persisted by an earlier run, and negative
+caching of failed strings.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from translation_cache import TranslationCache
+
+def temp_db(directory):
+    return os.path.join(directory, 'cache.db')
+
+def test_ttl_expiry():
+    """An expired entry is a miss and is not served again from disk"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TranslationCache(max_size=8, ttl=0.1, db_path=temp_db(directory), db_ttl=100)
+        cache.put('EXIT', 'hi', 'निकास')
+        assert cache.get('EXIT', 'hi') == 'निकास'
+        time.sleep(0.15)
+        assert cache.get('EXIT', 'hi') is None
+        assert cache.get('EXIT', 'hi') is None
+        assert cache.stats['hits'] == 1 and cache.stats['disk_hits'] == 0
+        assert cache.stats['misses'] == 2
+        cache.close()
+    print("Translation cache: expired entries dropped from both tiers")
+
+def test_eviction_reload_keeps_age():
+    """An LRU-evicted entry reloads from disk but still expires on its original ttl"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TranslationCache(max_size=1, ttl=0.3, db_path=temp_db(directory), db_ttl=100)
+        cache.put('EXIT', 'hi', 'निकास')
+        time.sleep(0.2)
+        cache.put('STOP', 'hi', 'रुको')
+        assert cache.stats['evictions'] == 1 and len(cache) == 1
+        assert cache.get('EXIT', 'hi') == 'निकास'
+        assert cache.stats['disk_hits'] == 1
+        time.sleep(0.2)
+        cache.put('STOP', 'hi', 'रुको')  # Evict the reloaded entry again
+        assert cache.get('EXIT', 'hi') is None
+        cache.close()
+    print("Translation cache: evicted entries reload with their original age")
+
+def test_rows_from_earlier_run():
+    """Rows older than this run are loaded within db_ttl, then get a fresh ttl"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = temp_db(directory)
+        TranslationCache(db_path=path).close()
+        with sqlite3.connect(path) as db:
+            db.executemany('INSERT INTO translations VALUES (?, ?, ?, ?)',
+                           [('EXIT', 'hi', 'निकास', time.time() - 3600),
+                            ('STOP', 'hi', 'रुको', time.time() - 7200)])
+        cache = TranslationCache(ttl=60, db_path=path, db_ttl=5400)
+        assert cache.get('EXIT', 'hi') == 'निकास'
+        assert cache.get('STOP', 'hi') is None  # Older than db_ttl
+        cache.close()
+    print("Translation cache: persisted rows survive a restart within db_ttl")
+
+def test_negative_caching():
+    """Failures are remembered for negative_ttl, never served, and cleared by a success"""
+    cache = TranslationCache(max_size=8, ttl=10, negative_ttl=0.1, db_path='')
+    cache.put_failure('EXIT', 'hi')
+    assert cache.is_failed('EXIT', 'hi')
+    assert cache.get('EXIT', 'hi') is None
+    time.sleep(0.15)
+    assert not cache.is_failed('EXIT', 'hi')
+    cache.put_failure('EXIT', 'hi')
+    cache.put('EXIT', 'hi', 'निकास')
+    assert not cache.is_failed('EXIT', 'hi')
+    assert cache.stats['negative_hits'] == 1
+    print("Translation cache: failures negatively cached")
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_eviction_reload_keeps_age()
+    test_rows_from_earlier_run()
+    test_negative_caching()
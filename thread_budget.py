@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import cv2
+import config
+
+STAGES = ('capture', 'ocr', 'translation', 'display')
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+class ThreadBudget:
+    """Core set and thread count for each pipeline stage, from a named profile
+
+    A profile in THREAD_PROFILES maps each stage to {'cores': (...),
+    'threads': n}. Core numbers index the CPUs this process may use and
+    wrap around, so a four-core profile still runs on a smaller machine.
+    Each stage calls apply() from its own thread when it starts: the thread
+    is pinned with os.sched_setaffinity, the OCR stage sets torch's
+    intra-op threads and the display stage sets OpenCV's pool. Both pools
+    are process-wide, so one stage owns each: the display thread count
+    also bounds OpenCV calls made by OCR (resize, colour conversion), which
+    are small next to the model. OMP_NUM_THREADS is set from the OCR
+    budget before torch is imported. The OCR stage is applied in the thread
+    that loads the model as well as in the OCR thread, since torch's pool
+    threads inherit the CPU mask of the thread that first uses it.
+    """
+    def __init__(self, profile=None, profiles=None, cpus=None):
+        self.profile = config.THREAD_PROFILE if profile is None else profile
+        profiles = config.THREAD_PROFILES if profiles is None else profiles
+        self.cpus = available_cpus() if cpus is None else list(cpus)
+        self.stages = {}
+        for stage, spec in profiles[self.profile].items():
+            cores = sorted({self.cpus[core % len(self.cpus)] for core in spec['cores']})
+            self.stages[stage] = {'cores': cores, 'threads': spec.get('threads', 1)}
+        self.effective = {}  # What each stage actually got, filled in by apply()
+        self._lock = threading.Lock()
+        os.environ['OMP_NUM_THREADS'] = str(self.threads('ocr') or 1)
+
+    def cores(self, stage):
+        spec = self.stages.get(stage)
+        return spec['cores'] if spec else None
+
+    def threads(self, stage):
+        spec = self.stages.get(stage)
+        return spec['threads'] if spec else None
+
+    def apply(self, stage):
+        """Pin the calling thread to the stage's cores and size the pools it owns"""
+        spec = self.stages.get(stage)
+        if spec is None:
+            return
+        applied = {'thread': threading.current_thread().name}
+        if hasattr(os, 'sched_setaffinity'):
+            # pid 0 is the calling thread on Linux; threads it starts inherit the mask
+            os.sched_setaffinity(0, spec['cores'])
+            applied['cores'] = sorted(os.sched_getaffinity(0))
+        if stage == 'ocr':
+            torch = sys.modules.get('torch')  # Only if the OCR backend loaded it
+            if torch is not None:
+                torch.set_num_threads(spec['threads'])
+                applied['torch_threads'] = torch.get_num_threads()
+        elif stage == 'display':
+            cv2.setNumThreads(spec['threads'])
+            applied['opencv_threads'] = cv2.getNumThreads()
+        with self._lock:
+            self.effective[stage] = applied
+
+    def report(self):
+        """Planned and effective configuration per stage"""
+        with self._lock:
+            stages = {stage: dict(self.stages[stage], effective=self.effective.get(stage))
+                      for stage in STAGES if stage in self.stages}
+        return {'profile': self.profile, 'cpus': self.cpus, 'stages': stages}
+
+class NullThreadBudget:
+    """No pinning or pool sizing; the OS, torch and OpenCV decide"""
+    profile = 'off'
+
+    def cores(self, stage):
+        return None
+
+    def threads(self, stage):
+        return None
+
+    def apply(self, stage):
+        pass
+
+    def report(self):
+        return {'profile': self.profile, 'cpus': available_cpus(), 'stages': {}}
+
+def create_thread_budget(profile=None):
+    profile = config.THREAD_PROFILE if profile is None else profile
+    if not config.THREAD_PROFILES.get(profile):
+        if profile != 'off':
+            print(f"Unknown thread profile {profile!r}; threads are not managed")
+        return NullThreadBudget()
+    return ThreadBudget(profile)
@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+import config
+
+class _Track:
+    def __init__(self, result, points):
+        self.result = result
+        self.points = points  # Nx1x2 float32 in downscaled coordinates
+        self.dx = 0.0
+        self.dy = 0.0
+
+class OverlayTracker:
+    """Carry OCR result bboxes forward between OCR passes
+
+    Sparse Lucas-Kanade optical flow is run on a downscaled grayscale copy
+    of each displayed frame. Every result keeps the features found inside
+    its bbox on the OCR'd frame and is shifted by their median motion.
+    Results with too few features to track (low-texture or small text) stay
+    drawn where OCR found them until the next OCR pass replaces them.
+    Tracks that lose too many features on the way are dropped.
+    """
+    def __init__(self, scale=None, max_features=None, min_features=None):
+        self.scale = config.TRACK_SCALE if scale is None else scale
+        self.max_features = (config.TRACK_MAX_FEATURES
+                             if max_features is None else max_features)
+        self.min_features = (config.TRACK_MIN_FEATURES
+                             if min_features is None else min_features)
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self._tracks = []
+        self._prev_gray = None
+        self._frame_size = None
+        self.stats = {'tracks_started': 0, 'tracks_lost': 0, 'untracked': 0}
+
+    def _gray(self, frame):
+        if len(frame.shape) == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _features(self, gray, bbox):
+        x, y, w, h = [int(round(v * self.scale)) for v in bbox]
+        mask = np.zeros_like(gray)
+        mask[max(y, 0):y + h, max(x, 0):x + w] = 255
+        return cv2.goodFeaturesToTrack(gray, maxCorners=self.max_features,
+                                       qualityLevel=0.01, minDistance=3, mask=mask)
+
+    def set_results(self, results, source_frame):
+        """Start new tracks from results OCR'd on source_frame"""
+        gray = self._gray(source_frame)
+        self._frame_size = source_frame.shape[1], source_frame.shape[0]
+        self._tracks = []
+        for result in results:
+            points = self._features(gray, result['bbox'])
+            if points is None or len(points) < self.min_features:
+                points = None  # Untracked: shown in place until the next OCR pass
+                self.stats['untracked'] += 1
+            else:
+                self.stats['tracks_started'] += 1
+            self._tracks.append(_Track(result, points))
+        self._prev_gray = gray
+
+    def update(self, frame):
+        """Advance all tracks to frame and return results with moved bboxes"""
+        if not self._tracks:
+            return []
+
+        gray = self._gray(frame)
+        tracked = [t for t in self._tracks if t.points is not None]
+
+        if tracked and self._prev_gray is not None:
+            all_points = np.concatenate([t.points for t in tracked])
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(
+                self._prev_gray, gray, all_points, None, **self.lk_params)
+            status = status.reshape(-1).astype(bool)
+
+            lost = set()
+            start = 0
+            for track in tracked:
+                end = start + len(track.points)
+                ok = status[start:end]
+                if ok.sum() < self.min_features:
+                    lost.add(id(track))
+                else:
+                    motion = new_points[start:end][ok] - track.points[ok]
+                    dx, dy = np.median(motion.reshape(-1, 2), axis=0)
+                    track.dx += dx / self.scale
+                    track.dy += dy / self.scale
+                    track.points = new_points[start:end][ok].reshape(-1, 1, 2)
+                start = end
+
+            if lost:
+                self.stats['tracks_lost'] += len(lost)
+                self._tracks = [t for t in self._tracks if id(t) not in lost]
+
+        self._prev_gray = gray
+        return [self._moved(t) for t in self._tracks]
+
+    def _moved(self, track):
+        if track.dx == 0 and track.dy == 0:
+            return track.result
+        x, y, w, h = track.result['bbox']
+        width, height = self._frame_size
+        x = int(min(max(x + track.dx, 0), width - w))
+        y = int(min(max(y + track.dy, 0), height - h))
+        moved = dict(track.result)
+        moved['bbox'] = (x, y, w, h)
+        return moved
+
+class StaticTracker:
+    """Tracker that leaves bboxes where OCR found them"""
+    def __init__(self):
+        self._results = []
+        self.stats = {'tracks_started': 0, 'tracks_lost': 0, 'untracked': 0}
+
+    def set_results(self, results, source_frame):
+        self._results = results
+        self.stats['tracks_started'] += len(results)
+
+    def update(self, frame):
+        return self._results
+
+def create_tracker():
+    if config.TRACKING_ENABLED:
+        return OverlayTracker()
+    return StaticTracker()
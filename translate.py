@@ -1,52 +1,125 @@
-from googletrans import Translator
-from functools import lru_cache
 import time
+import config
+from layout import create_assembler
+from phrase_table import create_phrase_table
+from translation_cache import TranslationCache
 
-class TranslationProcessor:
-    def __init__(self, target_lang='hi'):
+class GoogleTransBackend:
+    """googletrans backend that sends a whole batch as one request"""
+    def __init__(self, separator=None):
+        from googletrans import Translator  # Deferred: slow import not needed for first frame
         self.translator = Translator()
+        self.separator = config.TRANSLATION_BATCH_SEPARATOR if separator is None else separator
+
+    def translate(self, text, dest):
+        return self.translator.translate(text, dest=dest).text
+
+    def translate_batch(self, texts, dest):
+        if len(texts) == 1:
+            return [self.translate(texts[0], dest)]
+        # googletrans translates lists item by item, so join into one request
+        joined = self.separator.join(texts)
+        parts = self.translator.translate(joined, dest=dest).text.split(self.separator)
+        if len(parts) != len(texts):
+            # Translator merged or split lines; fall back to one call per string
+            return [self.translate(text, dest) for text in texts]
+        return [part.strip() for part in parts]
+
+class StubTranslationBackend:
+    """Local backend with configurable latency for offline testing"""
+    def __init__(self, latency=None, per_item_latency=0.0):
+        self.latency = config.TRANSLATION_STUB_LATENCY if latency is None else latency
+        self.per_item_latency = per_item_latency
+        self.calls = 0
+
+    def translate(self, text, dest):
+        return self.translate_batch([text], dest)[0]
+
+    def translate_batch(self, texts, dest):
+        self.calls += 1
+        time.sleep(self.latency + self.per_item_latency * len(texts))
+        return [f"[{dest}] {text}" for text in texts]
+
+def create_backend(name=None):
+    name = config.TRANSLATION_BACKEND if name is None else name
+    if name == 'stub':
+        return StubTranslationBackend()
+    return GoogleTransBackend()
+
+class TranslationProcessor:
+    def __init__(self, target_lang='hi', backend=None, cache=None, phrases=None):
+        self.backend = backend if backend is not None else create_backend()
         self.target_lang = target_lang
-        self.cache_timeout = 300  # 5 minutes
-        self._cache = {}
+        self.cache = cache if cache is not None else TranslationCache()
+        self.layout = create_assembler()
+        self.phrases = phrases if phrases is not None else create_phrase_table()
         
-    @lru_cache(maxsize=512)
-    def _translate_cached(self, text, dest):
+    def _translate_one(self, text):
         try:
-            result = self.translator.translate(text, dest=dest)
-            return result.text
+            return self.backend.translate(text, self.target_lang)
         except Exception:
-            return text
+            return None
             
-    def _clean_cache(self):
-        current_time = time.time()
-        expired_keys = [k for k, (_, timestamp) in self._cache.items() 
-                       if current_time - timestamp > self.cache_timeout]
-        for key in expired_keys:
-            del self._cache[key]
+    def _translate_texts(self, texts):
+        """Look up texts in the cache and translate all misses in one backend call"""
+        translations = {}
+        misses = []
+        for text in texts:
+            if text in translations or text in misses:
+                continue
+            fixed = self.phrases.lookup(text, self.target_lang)
+            if fixed is not None:
+                translations[text] = fixed
+                continue
+            cached = self.cache.get(text, self.target_lang)
+            if cached is not None:
+                translations[text] = cached
+            elif self.cache.is_failed(text, self.target_lang):
+                translations[text] = text
+            else:
+                misses.append(text)
+        if not misses:
+            return translations
             
-    def process(self, ocr_results):
-        if not ocr_results:
-            return []
+        try:
+            results = self.backend.translate_batch(misses, self.target_lang)
+        except Exception:
+            results = [self._translate_one(text) for text in misses]
             
-        self._clean_cache()
-        translated_results = []
+        succeeded = []
+        for text, translated_text in zip(misses, results):
+            if translated_text is None:
+                self.cache.put_failure(text, self.target_lang)
+                translations[text] = text
+            else:
+                succeeded.append((text, translated_text))
+                translations[text] = translated_text
+        self.cache.put_many(self.target_lang, succeeded)
+        return translations
         
+    def _apply(self, ocr_results, translations):
+        translated_results = []
         for result in ocr_results:
             text = result['text']
-            cache_key = f"{text}_{self.target_lang}"
-            
-            # Check cache first
-            if cache_key in self._cache:
-                translated_text = self._cache[cache_key][0]
-            else:
-                translated_text = self._translate_cached(text, self.target_lang)
-                self._cache[cache_key] = (translated_text, time.time())
-                
             translated_results.append({
                 'original': text,
-                'translated': translated_text,
+                'translated': translations.get(text, text),
                 'bbox': result['bbox'],
                 'confidence': result['confidence']
             })
-            
         return translated_results
+        
+    def process(self, ocr_results):
+        if not ocr_results:
+            return []
+            
+        ocr_results = self.layout.assemble(ocr_results)
+        translations = self._translate_texts([result['text'] for result in ocr_results])
+        return self._apply(ocr_results, translations)
+        
+    def process_batch(self, batch):
+        """Translate several frames' OCR results with one backend call"""
+        batch = [self.layout.assemble(ocr_results) for ocr_results in batch]
+        translations = self._translate_texts([result['text'] for ocr_results in batch
+                                              for result in ocr_results])
+        return [self._apply(ocr_results, translations) for ocr_results in batch]
@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import config
+
+class TranslationCache:
+    """Bounded LRU translation cache with TTL, negative caching and a disk tier
+
+    Memory entries live in an OrderedDict so lookups, refreshes and LRU
+    eviction are all O(1); expiry is checked lazily when an entry is read.
+    Failed translations are remembered separately for a short time so an
+    outage does not hammer the backend, but they are never served as
+    translations. When a database path is given, successful translations
+    are written through to sqlite and read back on a memory miss, so warm
+    entries survive restarts for up to db_ttl. A translation that expires
+    in memory (ttl) is dropped from both tiers, so it is re-translated
+    rather than served again from disk. An entry reloaded from disk keeps
+    the age of its row, so LRU eviction does not restart its ttl; rows from
+    an earlier run count their ttl from when this cache was opened.
+    """
+    def __init__(self, max_size=None, ttl=None, negative_ttl=None,
+                 db_path=None, db_ttl=None):
+        self.max_size = config.TRANSLATION_CACHE_SIZE if max_size is None else max_size
+        self.ttl = config.TRANSLATION_CACHE_TIMEOUT if ttl is None else ttl
+        self.negative_ttl = (config.TRANSLATION_NEGATIVE_CACHE_TIMEOUT
+                             if negative_ttl is None else negative_ttl)
+        self.db_ttl = config.TRANSLATION_CACHE_DB_TTL if db_ttl is None else db_ttl
+        db_path = config.TRANSLATION_CACHE_DB if db_path is None else db_path
+
+        self._entries = OrderedDict()
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._opened = time.time()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'negative_hits': 0, 'evictions': 0}
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, path):
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS translations ('
+                             'text TEXT NOT NULL, lang TEXT NOT NULL, '
+                             'translated TEXT NOT NULL, timestamp REAL NOT NULL, '
+                             'PRIMARY KEY (text, lang))')
+            self._db.execute('DELETE FROM translations WHERE timestamp < ?',
+                             (time.time() - self.db_ttl,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache DB error: {e}")
+            self._db = None
+
+    def _load(self, text, lang):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                'SELECT translated, timestamp FROM translations '
+                'WHERE text = ? AND lang = ? AND timestamp >= ?',
+                (text, lang, time.time() - self.db_ttl)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row
+
+    def _delete(self, text, lang):
+        if self._db is None:
+            return
+        try:
+            self._db.execute('DELETE FROM translations WHERE text = ? AND lang = ?',
+                             (text, lang))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache DB error: {e}")
+
+    def _store_memory(self, key, translated, now):
+        self._entries[key] = (translated, now)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get(self, text, lang):
+        """Return cached translation or None on a miss"""
+        key = (text, lang)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[0]
+                # Expired: the disk row is at least as old, so drop it too
+                del self._entries[key]
+                self._delete(text, lang)
+                self.stats['misses'] += 1
+                return None
+
+            row = self._load(text, lang)
+            if row is not None:
+                translated, stored = row[0], max(row[1], self._opened)
+                if now - stored <= self.ttl:
+                    self._store_memory(key, translated, stored)
+                    self.stats['disk_hits'] += 1
+                    return translated
+                self._delete(text, lang)
+
+            self.stats['misses'] += 1
+            return None
+
+    def is_failed(self, text, lang):
+        """True while a recent failure for this text is negatively cached"""
+        key = (text, lang)
+        with self._lock:
+            failed_at = self._failures.get(key)
+            if failed_at is None:
+                return False
+            if time.time() - failed_at <= self.negative_ttl:
+                self.stats['negative_hits'] += 1
+                return True
+            del self._failures[key]
+            return False
+
+    def put_many(self, lang, translations):
+        """Store successful translations given as (text, translated) pairs"""
+        if not translations:
+            return
+        now = time.time()
+        with self._lock:
+            for text, translated in translations:
+                self._failures.pop((text, lang), None)
+                self._store_memory((text, lang), translated, now)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)',
+                        [(text, lang, translated, now) for text, translated in translations])
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Translation cache DB error: {e}")
+
+    def put(self, text, lang, translated):
+        self.put_many(lang, [(text, translated)])
+
+    def put_failure(self, text, lang):
+        with self._lock:
+            self._failures[(text, lang)] = time.time()
+            self._failures.move_to_end((text, lang))
+            if len(self._failures) > self.max_size:
+                self._failures.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None